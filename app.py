@@ -1,13 +1,14 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, Response, abort, render_template, request, jsonify, flash, redirect, url_for
 import sqlite3
 from pathlib import Path
 from datetime import datetime
 import json
-import io
-import requests
 from PIL import Image
-import imagehash
-from utils.visualizer import create_platform_stats_chart
+from utils.image_hashing import compute_image_hashes
+from utils.database import connect, ensure_schema, build_fts_query, get_posts_page
+from utils.hash_index import ProfileHashIndex
+from utils import stats
+from utils.image_cache import image_cache
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Required for flashing messages
@@ -15,81 +16,151 @@ app.secret_key = 'your-secret-key-here'  # Required for flashing messages
 # Path to your SQLite database
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "db" / "osint_data.db"
-CHARTS_DIR = BASE_DIR / "static" / "charts"
-CHARTS_DIR.mkdir(exist_ok=True)
+SEARCH_LIMIT = 100
+SEARCH_MAX_LIMIT = 500
+FEED_PAGE_SIZE = 60
+FEED_MAX_PAGE_SIZE = 200
+STATS_CACHE_SECONDS = 30
+
+IMAGE_MATCH_THRESHOLD = 10  # max combined Hamming distance for a match
+IMAGE_MATCH_LIMIT = 50
+
+# Create/migrate the schema (WAL, indexes) before serving requests
+ensure_schema(DB_PATH)
+
+# Nearest-neighbour index over stored profile picture hashes
+profile_index = ProfileHashIndex()
+profile_index.load(DB_PATH)
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     conn.row_factory = sqlite3.Row  # Access rows like dictionaries
     return conn
 
+@app.template_global()
+def avatar_url(item):
+    """Thumbnail URL served from the local image cache, falling back to the original profile_pic"""
+    if item.get('platform') and item.get('username'):
+        return url_for('avatar', platform=item['platform'], username=item['username'])
+    return item.get('profile_pic')
+
+@app.route("/avatar/<platform>/<path:username>")
+def avatar(platform, username):
+    """Profile picture thumbnail for a known user, downloaded once and then served from disk"""
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT profile_pic FROM user_details WHERE platform = ? AND username = ?",
+        (platform, username)
+    ).fetchone()
+    if not row or not row['profile_pic']:
+        row = conn.execute(
+            """
+            SELECT profile_pic FROM social_media_posts
+            WHERE platform = ? AND username = ? AND profile_pic IS NOT NULL AND profile_pic != ''
+            ORDER BY timestamp DESC
+            LIMIT 1
+            """,
+            (platform, username)
+        ).fetchone()
+    conn.close()
+    if not row or not row['profile_pic']:
+        abort(404)
+
+    data = image_cache.thumbnail(row['profile_pic'])
+    if data is None:
+        return redirect(row['profile_pic'])
+    return Response(data, mimetype='image/jpeg', headers={'Cache-Control': 'public, max-age=86400'})
+
+def load_feed_page(conn):
+    """Feed page for the request's ?cursor= and ?limit=, or (None, None) for a bad cursor"""
+    limit = max(1, min(request.args.get('limit', FEED_PAGE_SIZE, type=int), FEED_MAX_PAGE_SIZE))
+    try:
+        rows, next_cursor = get_posts_page(conn, limit, request.args.get('cursor') or None)
+    except ValueError:
+        return None, None
+    return [dict(row) for row in rows], next_cursor
+
 @app.route("/")
 def home():
-    """Home page showing all posts as cards with statistics"""
+    """Home page showing the newest posts as cards with statistics; older posts via ?cursor="""
     conn = get_db_connection()
-    
-    # Get posts with sentiment analysis
-    posts = conn.execute("""
-        SELECT p.*, u.followers, u.following, u.bio
-        FROM social_media_posts p
-        LEFT JOIN user_details u 
-            ON p.username = u.username 
-            AND p.platform = u.platform
-        ORDER BY p.timestamp DESC
-    """).fetchall()
-
-    # Coerce sentiment to float (fixes TypeError in templates when comparing)
-    posts = [dict(post) for post in posts]
-    for p in posts:
-        s = p.get('sentiment')
-        try:
-            p['sentiment'] = float(s) if s is not None and s != '' else None
-        except (ValueError, TypeError):
-            p['sentiment'] = None
-    
-    # Get platform statistics
-    platforms = conn.execute("""
-        SELECT DISTINCT platform 
-        FROM social_media_posts
-    """).fetchall()
-    platforms = [p['platform'] for p in platforms]
-    
-    # Get unique users count
-    unique_users = conn.execute("""
-        SELECT COUNT(DISTINCT username) as count
-        FROM social_media_posts
-    """).fetchone()['count']
-    
-    # Generate platform statistics chart
-    create_platform_stats_chart(
-        DB_PATH,
-        CHARTS_DIR / "platform_stats.png"
-    )
+
+    # One page of posts with sentiment analysis
+    posts, next_cursor = load_feed_page(conn)
+    if posts is None:
+        conn.close()
+        flash('That page link is no longer valid, showing the newest posts.', 'error')
+        return redirect(url_for('home'))
+
+    # Dashboard counters come from the trigger-maintained stats tables
+    totals = stats.get_totals(conn)
+    platforms = [p['platform'] for p in stats.get_platform_counts(conn)]
     
     conn.close()
     
     return render_template("index.html",
                          posts=posts,
+                         next_cursor=next_cursor,
+                         is_first_page=not request.args.get('cursor'),
+                         total_posts=totals['posts'],
                          platforms=platforms,
-                         unique_users=unique_users)
+                         unique_users=totals['users'])
+
+@app.route("/api/posts")
+def api_posts():
+    """JSON feed page: ?cursor= from the previous response's next_cursor, ?limit= up to FEED_MAX_PAGE_SIZE"""
+    conn = get_db_connection()
+    posts, next_cursor = load_feed_page(conn)
+    conn.close()
+    if posts is None:
+        return jsonify({'error': 'invalid cursor'}), 400
+    for p in posts:
+        p['avatar_url'] = avatar_url(p)
+    return jsonify({'posts': posts, 'next_cursor': next_cursor})
 
 
-def fetch_image_hash_from_url(url, timeout=8):
-    """Download image from URL and compute perceptual hash (phash). Returns imagehash.ImageHash or None."""
-    if not url:
-        return None
-    try:
-        resp = requests.get(url, timeout=timeout)
-        resp.raise_for_status()
-        img = Image.open(io.BytesIO(resp.content)).convert('RGB')
-        return imagehash.phash(img)
-    except Exception:
-        return None
+def stats_response(payload):
+    """JSON for the client-side charts; aggregates change slowly so browsers may reuse them briefly"""
+    response = jsonify(payload)
+    response.headers['Cache-Control'] = f'public, max-age={STATS_CACHE_SECONDS}'
+    return response
+
+@app.route("/api/stats/summary")
+def api_stats_summary():
+    """Total posts, distinct users and number of platforms"""
+    conn = get_db_connection()
+    totals = stats.get_totals(conn)
+    platforms = stats.get_platform_counts(conn)
+    conn.close()
+    return stats_response({**totals, 'platforms': len(platforms)})
+
+@app.route("/api/stats/platforms")
+def api_stats_platforms():
+    """Posts and distinct users per platform"""
+    conn = get_db_connection()
+    rows = stats.get_platform_counts(conn)
+    conn.close()
+    return stats_response(stats.as_series(rows, 'platform', ['posts', 'users']))
 
+@app.route("/api/stats/sentiment")
+def api_stats_sentiment():
+    """Positive/neutral/negative post counts per platform"""
+    conn = get_db_connection()
+    rows = stats.get_sentiment_by_platform(conn)
+    conn.close()
+    return stats_response(stats.as_series(rows, 'platform', ['positive', 'neutral', 'negative']))
+
+@app.route("/api/stats/sentiment/daily")
+def api_stats_sentiment_daily():
+    """Per-day post and sentiment counts; optional ?platform= and ?since=YYYY-MM-DD"""
+    conn = get_db_connection()
+    rows = stats.get_sentiment_daily(conn, request.args.get('platform'), request.args.get('since'))
+    conn.close()
+    return stats_response(stats.as_series(rows, 'day', ['posts', 'positive', 'neutral', 'negative']))
 
 @app.route('/search_by_image', methods=['GET', 'POST'])
 def search_by_image():
-    """Search user profiles by uploading a profile image. Compares perceptual hashes against stored profile_pic URLs in user_details."""
+    """Search user profiles by uploading a profile image. Compares its perceptual hash against the phashes stored in user_details."""
     if request.method == 'POST':
         file = request.files.get('image')
         if not file:
@@ -102,32 +173,11 @@ def search_by_image():
             flash('Uploaded file is not a valid image.', 'error')
             return redirect(url_for('search_by_image'))
 
-        target_hash = imagehash.phash(img)
+        target_hashes = compute_image_hashes(img)
 
-        # Query all user profile_pic URLs from DB
-        conn = get_db_connection()
-        rows = conn.execute("SELECT platform, username, name, profile_pic FROM user_details WHERE profile_pic IS NOT NULL AND profile_pic != ''").fetchall()
-        conn.close()
-
-        matches = []
-        for r in rows:
-            url = r['profile_pic']
-            h = fetch_image_hash_from_url(url)
-            if h is None:
-                continue
-            # Hamming distance threshold: <= 10 is a reasonable starting point for phash (adjustable)
-            dist = target_hash - h
-            if dist <= 10:
-                matches.append({
-                    'platform': r['platform'],
-                    'username': r['username'],
-                    'name': r['name'],
-                    'profile_pic': url,
-                    'distance': int(dist)
-                })
-
-        # Sort by distance ascending
-        matches = sorted(matches, key=lambda x: x['distance'])
+        # Vectorized phash/dhash/whash scoring over hashes stored at enrichment time (no downloads here)
+        profile_index.refresh(DB_PATH)
+        matches = profile_index.best_matches(target_hashes, IMAGE_MATCH_LIMIT, max_distance=IMAGE_MATCH_THRESHOLD)
 
         # For each matched user, fetch their recent posts and prepare for rendering as cards
         conn = get_db_connection()
@@ -144,13 +194,6 @@ def search_by_image():
             ).fetchall()
 
             posts = [dict(p) for p in posts_rows]
-            # Coerce sentiment to float for template comparisons
-            for p in posts:
-                s = p.get('sentiment')
-                try:
-                    p['sentiment'] = float(s) if s is not None and s != '' else None
-                except (ValueError, TypeError):
-                    p['sentiment'] = None
 
             matches_posts.append({
                 'match': m,
@@ -164,29 +207,42 @@ def search_by_image():
 
 @app.route("/search")
 def search():
-    """Search by name, username, email, or profile_pic"""
+    """Full-text search over post text, name, username, email, profile_pic and user bios"""
     query = request.args.get("q", "").strip().lower()
+    limit = max(1, min(request.args.get("limit", SEARCH_LIMIT, type=int), SEARCH_MAX_LIMIT))
+    match = build_fts_query(query)
     conn = get_db_connection()
 
     posts = []
-    if query:
+    if match:
+        # Best-ranked matching posts first (bm25 via the FTS5 rank column)
         posts = conn.execute("""
-            SELECT * FROM social_media_posts
-            WHERE LOWER(name) LIKE ?
-               OR LOWER(username) LIKE ?
-               OR LOWER(email) LIKE ?
-               OR LOWER(profile_pic) LIKE ?
-        """, (f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%")).fetchall()
+            SELECT p.rowid AS post_rowid, p.*
+            FROM posts_fts
+            JOIN social_media_posts p ON p.rowid = posts_fts.rowid
+            WHERE posts_fts MATCH ?
+            ORDER BY posts_fts.rank
+            LIMIT ?
+        """, (match, limit)).fetchall()
+
+        # Then recent posts by users whose profile (bio, location...) matches
+        remaining = limit - len(posts)
+        if remaining > 0:
+            seen = {p['post_rowid'] for p in posts}
+            user_posts = conn.execute("""
+                SELECT p.rowid AS post_rowid, p.*
+                FROM users_fts
+                JOIN user_details u ON u.rowid = users_fts.rowid
+                JOIN social_media_posts p
+                    ON p.platform = u.platform AND p.username = u.username
+                WHERE users_fts MATCH ?
+                ORDER BY users_fts.rank, p.timestamp DESC
+                LIMIT ?
+            """, (match, remaining + len(seen))).fetchall()
+            posts += [p for p in user_posts if p['post_rowid'] not in seen][:remaining]
     conn.close()
 
-    # Coerce sentiment to float for template comparisons
     posts = [dict(p) for p in posts]
-    for p in posts:
-        s = p.get('sentiment')
-        try:
-            p['sentiment'] = float(s) if s is not None and s != '' else None
-        except (ValueError, TypeError):
-            p['sentiment'] = None
 
     return render_template("search.html", posts=posts, query=query)
 
@@ -0,0 +1,89 @@
+"""
+Async collector interface.
+Every collector is driven from one event loop through `stream()`, which yields
+batches of records. Adapters wrap the existing sync `fetch_*` functions,
+coroutine collectors and async record streams (Telegram, Discord).
+"""
+import asyncio
+import inspect
+import time
+from typing import AsyncIterator, Callable, List
+
+
+class AsyncCollector:
+    """Base class for collectors run by utils.fetch_engine"""
+
+    def __init__(self, name: str, func: Callable, args: tuple = ()):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+
+    async def fetch(self) -> List[dict]:
+        """Return all records at once"""
+        raise NotImplementedError
+
+    async def stream(self) -> AsyncIterator[List[dict]]:
+        """Yield batches of records as they become available"""
+        yield await self.fetch() or []
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class SyncCollector(AsyncCollector):
+    """Runs a blocking fetch_* function on the loop's thread pool"""
+
+    async def fetch(self) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.func(*self.args))
+
+
+class CoroutineCollector(AsyncCollector):
+    """Awaits a coroutine fetch function that returns a list of records"""
+
+    async def fetch(self) -> List[dict]:
+        return await self.func(*self.args)
+
+
+class StreamCollector(AsyncCollector):
+    """
+    Wraps an async generator of single records (e.g. Telegram iter_messages,
+    Discord on_message) and yields them in batches so downstream stages
+    don't have to wait for the stream to end.
+    """
+
+    def __init__(self, name: str, func: Callable, args: tuple = (),
+                 batch_size: int = 20, flush_interval: float = 2.0):
+        super().__init__(name, func, args)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    async def fetch(self) -> List[dict]:
+        records = []
+        async for batch in self.stream():
+            records.extend(batch)
+        return records
+
+    async def stream(self) -> AsyncIterator[List[dict]]:
+        batch = []
+        last_flush = time.monotonic()
+        async for record in self.func(*self.args):
+            if not record:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                yield batch
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            yield batch
+
+
+def as_collector(entry) -> AsyncCollector:
+    """Accept either an AsyncCollector or a legacy (name, fetch_func, args) tuple"""
+    if isinstance(entry, AsyncCollector):
+        return entry
+    name, func, args = entry
+    if inspect.iscoroutinefunction(func):
+        return CoroutineCollector(name, func, args)
+    return SyncCollector(name, func, args)
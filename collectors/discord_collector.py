@@ -1,29 +1,62 @@
 import discord
 import asyncio
 import os
+import time
 
 DISCORD_KEY = os.getenv("DISCORD_KEY")
 intents = discord.Intents.default()
 intents.message_content = True
 client = discord.Client(intents=intents)
 messages = []
+# Set while stream_discord_messages is listening
+_listener = None
+
+def _to_record(message):
+    return {
+        "platform": "discord",
+        "name": message.author.display_name,
+        "username": message.author.name,
+        "email": getattr(message.author, "email", ""),
+        "profile_pic": str(message.author.avatar.url) if message.author.avatar else "",
+        "timestamp": str(message.created_at),
+        "text": message.content,
+        "url": f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
+    }
 
 @client.event
 async def on_message(message):
     if not message.author.bot:
-        messages.append({
-            "platform": "discord",
-            "name": message.author.display_name,
-            "username": message.author.name,
-            "email": getattr(message.author, "email", ""),
-            "profile_pic": str(message.author.avatar.url) if message.author.avatar else "",
-            "timestamp": str(message.created_at),
-            "text": message.content,
-            "url": f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
-        })
+        record = _to_record(message)
+        messages.append(record)
+        if _listener is not None:
+            _listener.put_nowait(record)
+
+async def stream_discord_messages(timeout=10):
+    """Yield messages from on_message as they arrive, for `timeout` seconds"""
+    global _listener
+    if not DISCORD_KEY:
+        print("Error: DISCORD_KEY not found")
+        return
+
+    _listener = asyncio.Queue()
+    runner = asyncio.create_task(client.start(DISCORD_KEY))
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or runner.done():
+                break
+            try:
+                yield await asyncio.wait_for(_listener.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+    finally:
+        _listener = None
+        await client.close()
+        if runner.done() and not runner.cancelled() and runner.exception():
+            print(f"Discord error: {runner.exception()}")
 
 async def fetch_discord_messages(timeout=10):
-    await client.start(DISCORD_KEY)
-    await asyncio.sleep(timeout)
-    await client.close()
+    async for _ in stream_discord_messages(timeout):
+        pass
     return messages
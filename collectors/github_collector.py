@@ -1,5 +1,5 @@
 import os
-import requests
+from utils import http_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,7 +17,7 @@ def fetch_github(query="AI", limit=5):
 
     try:
         # Search repositories (more likely to produce usable 'text' fields)
-        res = requests.get(
+        res = http_client.get(
             f"https://api.github.com/search/repositories",
             headers=headers,
             params={"q": query, "per_page": limit},
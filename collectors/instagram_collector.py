@@ -1,5 +1,5 @@
 import os
-import requests
+from utils import http_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,7 +19,7 @@ def fetch_instagram(hashtag="gaming", limit=5):
     params = {"hashtag": hashtag}
 
     try:
-        res = requests.get(url, headers=headers, params=params, timeout=30)
+        res = http_client.get(url, headers=headers, params=params, timeout=30)
         res.raise_for_status()
         data = res.json()
 
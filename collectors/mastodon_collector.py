@@ -1,8 +1,10 @@
 from mastodon import Mastodon
+from utils import http_client
 
 mastodon = Mastodon(
     access_token="YOUR_ACCESS_TOKEN",
-    api_base_url="https://mastodon.social"
+    api_base_url="https://mastodon.social",
+    session=http_client.get_session()
 )
 
 def fetch_mastodon(hashtag="osint", limit=10):
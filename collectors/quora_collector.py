@@ -1,8 +1,8 @@
-import requests 
+from utils import http_client 
 from bs4 import BeautifulSoup 
 def fetch_quora(query="osint", limit=5): 
  url = f"https://www.quora.com/search?q={query}"  
- soup = BeautifulSoup(requests.get(url).text, "html.parser")
+ soup = BeautifulSoup(http_client.get(url).text, "html.parser")
  results = [] 
  for i, q in enumerate(soup.find_all("span", {"class": "q-text"})):  
     if i >= limit: 
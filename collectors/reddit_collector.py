@@ -1,4 +1,5 @@
 import praw, os
+from utils import http_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,7 +9,9 @@ REDDIT_SECRET = os.getenv("REDDIT_SECRET")
 reddit = praw.Reddit(
     client_id=REDDIT_ID,
     client_secret=REDDIT_SECRET,
-    user_agent="osint_lab"
+    user_agent="osint_lab",
+    # prawcore rewrites the session User-Agent, so give it its own pooled session
+    requestor_kwargs={"session": http_client.build_session()}
 )
 
 def fetch_reddit(subreddit="technology", limit=10):
@@ -2,22 +2,36 @@ from telethon import TelegramClient
 import os 
 from dotenv import load_dotenv 
 load_dotenv() 
-api_id = int(os.getenv("TELEGRAM_API_ID")) 
+api_id = int(os.getenv("TELEGRAM_API_ID") or 0) 
 api_hash = os.getenv("TELEGRAM_API_HASH") 
 client = TelegramClient("osint_session", api_id, api_hash) 
+
+def _to_record(msg, channel):
+   return {
+      "platform": "telegram",
+      "user": str(msg.sender_id),
+      "username": getattr(msg.sender, "username", None) or "",
+      "name": getattr(msg.sender, "first_name", None) or "",
+      "email": "",
+      # sender.photo is a Telethon photo object, not a URL; there is no public link to it
+      "profile_pic": "",
+      "timestamp": str(msg.date),
+      "text": msg.text,
+      "url": f"https://t.me/{channel}/{msg.id}"
+   }
+
+async def stream_telegram(channel="osint_channel", limit=20):
+   """Yield channel messages one at a time as iter_messages returns them"""
+   if not (api_id and api_hash):
+      print("Error: TELEGRAM_API_ID/TELEGRAM_API_HASH not found")
+      return
+   if not client.is_connected():
+      await client.connect()
+   async for msg in client.iter_messages(channel, limit=limit):
+      yield _to_record(msg, channel)
+
 async def fetch_telegram(channel="osint_channel", limit=20):  
    results = []
-   async for msg in client.iter_messages(channel, limit=limit):
-      results.append({
-         "platform": "telegram",
-         "user": str(msg.sender_id),
-         "username": getattr(msg.sender, "username", ""),
-         "name": getattr(msg.sender, "first_name", ""),
-         "email": "",
-         "profile_pic": getattr(msg.sender, "photo", ""),
-         "timestamp": str(msg.date),
-         "text": msg.text,
-         "url": f"https://t.me/{channel}/{msg.id}"
-      })
+   async for record in stream_telegram(channel, limit):
+      results.append(record)
    return results
-         
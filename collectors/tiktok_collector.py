@@ -1,5 +1,6 @@
 import os
 import requests
+from utils import http_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,7 +27,7 @@ def fetch_tiktok(keyword="cybersecurity", limit=5):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=querystring, timeout=30)
+        response = http_client.get(url, headers=headers, params=querystring, timeout=30)
         if response.status_code != 200:
             print(f"TikTok API Error: HTTP {response.status_code} - {response.text[:200]}")
             return []
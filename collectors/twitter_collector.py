@@ -1,5 +1,6 @@
 import os
 import requests
+from utils import http_client
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -30,7 +31,7 @@ def fetch_twitter(query="AI", limit=10):
         params = {"query": query, "max_results": limit}
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=30)
+        resp = http_client.get(url, headers=headers, params=params, timeout=30)
         
         if resp.status_code == 429:
             print("⚠️ Twitter: Rate limit exceeded. Try again later.")
@@ -4,84 +4,77 @@ from collectors.facebook_collector import fetch_facebook
 from collectors.instagram_collector import fetch_instagram
 from collectors.tiktok_collector import fetch_tiktok 
 # from collectors.linkedin_collector import fetch_linkedin 
-from collectors.telegram_collector import fetch_telegram 
-#from collectors.discord_collector import messages 
+from collectors.telegram_collector import fetch_telegram, stream_telegram 
+from collectors.discord_collector import stream_discord_messages 
 from collectors.mastodon_collector import fetch_mastodon 
 from collectors.github_collector import fetch_github 
 from collectors.quora_collector import fetch_quora 
-from utils.user_details_collector import enrich_user_data
-from utils.database import save_user_details, init_db
+from utils.enrichment import enrich_records
+from utils.database import init_db, connect, compact_posts, backfill_profile_hashes
 from collectors.vk_collector import fetch_vk 
 from collectors.snapchat_collector import fetch_snapchat 
-from utils.cleaners import clean_text, filter_english 
+from utils.text_normalizer import normalize_records, normalize_text
 from utils.database import save_to_db 
-from utils.sentiment import add_sentiment
-from utils.user_details_collector import enrich_user_data
+from utils.nlp import NLPStage
+from utils.sentiment import get_backend, compare_backends
+from utils.sentiment_cache import SentimentCache
 from pathlib import Path
-import sqlite3
+import argparse
 from datetime import datetime
 from tabulate import tabulate
-from utils.sentiment import save_sentiment_chart
+from utils.fetch_engine import fetch_all
+from utils.pipeline import PIPELINE_FLUSH_INTERVAL, rebatch, run_stages
+from collectors.base import StreamCollector
 
 # Set a reliable database path
 BASE_DIR = Path(__file__).parent
 DB_PATH = BASE_DIR / "db" / "osint_data.db"
 
+def _as_text(value):
+    """Collector field as a string; objects that aren't plain values (API models, photos...) become ''"""
+    if value is None or isinstance(value, bool):
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return ""
+
 def normalize_record(item, platform):
-    """Normalize data into a common schema including user info"""
+    """Normalize data into a common schema (user details are filled in by enrich_records)"""
     if not item:
         return None
 
     # Get basic record info
     record = {
         "platform": platform,
-        "user": item.get("user") or item.get("username") or "N/A",
-        "username": item.get("username") or "",
-        "name": item.get("name") or "",
-        "email": item.get("email") or "",
-        "profile_pic": item.get("profile_pic") or "",
-        "timestamp": item.get("timestamp") or item.get("date") or item.get("created_at"),
-        "text": item.get("text") or item.get("caption") or item.get("description") or "",
-        "url": item.get("url") or item.get("link") or "",
-        "sentiment": None
+        "user": _as_text(item.get("user") or item.get("username")) or "N/A",
+        "username": _as_text(item.get("username")),
+        "name": _as_text(item.get("name")),
+        "email": _as_text(item.get("email")),
+        "profile_pic": _as_text(item.get("profile_pic")),
+        "timestamp": _as_text(item.get("timestamp") or item.get("date") or item.get("created_at")) or None,
+        "text": _as_text(item.get("text") or item.get("caption") or item.get("description")),
+        "url": _as_text(item.get("url") or item.get("link")),
+        "polarity": None,
+        "subjectivity": None,
+        "sentiment_label": None
     }
 
-    # Try to enrich user data
-    if record["username"]:
-        user_data = enrich_user_data(platform, record["username"])
-        if user_data:
-            # Update record with enriched data
-            record.update({
-                "name": user_data.get("name") or record["name"],
-                "email": user_data.get("email") or record["email"],
-                "profile_pic": user_data.get("profile_pic") or record["profile_pic"]
-            })
-            
-            # Save detailed user info
-            save_user_details({
-                "platform": platform,
-                "username": record["username"],
-                "name": user_data.get("name", ""),
-                "email": user_data.get("email", ""),
-                "profile_pic": user_data.get("profile_pic", ""),
-                "bio": user_data.get("bio", ""),
-                "location": user_data.get("location", ""),
-                "followers": user_data.get("followers", 0),
-                "following": user_data.get("following", 0)
-            }, DB_PATH)
-
     return record
 
 def print_db_records(limit=20):
     """Print both posts and user details from the database"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     
     # Print posts
     print("\n=== RECENT POSTS ===")
     c.execute("""
         SELECT platform, user, username, name, email, profile_pic, 
-               timestamp, text, url, sentiment 
+               timestamp, text, url, sentiment_label, polarity
         FROM social_media_posts 
         ORDER BY timestamp DESC 
         LIMIT ?
@@ -90,7 +83,7 @@ def print_db_records(limit=20):
     posts = c.fetchall()
     for post in posts:
         platform, user, username, name, email = post[0:5]
-        profile_pic, timestamp, text, url, sentiment = post[5:10]
+        profile_pic, timestamp, text, url, sentiment, polarity = post[5:11]
         
         print(f"\nPlatform: {platform}")
         print(f"User: {user}")
@@ -101,7 +94,7 @@ def print_db_records(limit=20):
         print(f"Timestamp: {timestamp}")
         print(f"Text: {text}")
         print(f"URL: {url}")
-        print(f"Sentiment: {sentiment}")
+        print(f"Sentiment: {sentiment} ({polarity})")
         print("-" * 40)
     
     # Print user details
@@ -122,9 +115,31 @@ def print_db_records(limit=20):
     
     conn.close()
 
-def run_pipeline(total_records=100):
-    data = []
+def benchmark_sentiment(limit=20000):
+    """Print parity with TextBlob and texts/second for every sentiment backend"""
+    conn = connect(DB_PATH)
+    texts = [normalize_text(row[0]) for row in conn.execute(
+        "SELECT text FROM social_media_posts WHERE text != '' LIMIT ?", (limit,))]
+    conn.close()
+    rows = compare_backends(texts)
+    if not rows:
+        print("⚠️ No stored posts to benchmark sentiment on.")
+        return
+    print(tabulate(
+        [[r["backend"], r["texts"], r["texts_per_sec"], f"{r['label_agreement']:.2%}",
+          f"{r['exact']:.2%}", f"{r['mean_polarity_diff']:.4f}"] for r in rows],
+        headers=["Backend", "Texts", "Texts/s", "Same label", "Same score", "Mean |Δ polarity|"],
+        tablefmt="grid"))
+
+def normalized_batches(fetched):
+    """Normalize each platform batch as it arrives from the fetch engine"""
+    for platform_name, platform_data in fetched:
+        try:
+            yield [normalize_record(d, platform_name) for d in platform_data if d]
+        except Exception as e:
+            print(f"Error normalizing {platform_name}: {e}")
 
+def run_pipeline(total_records=100):
     platforms = [
         ("Twitter", fetch_twitter, ("AI", 50)),  # you can put high limits; we'll slice later
         ("Reddit", fetch_reddit, ("technology", 50)),
@@ -133,52 +148,66 @@ def run_pipeline(total_records=100):
         ("TikTok", fetch_tiktok, ("cybersecurity", 50)),
         ("Mastodon", fetch_mastodon, ("ai", 50)),
         ("GitHub", fetch_github, ("leak", 50)),
-        ("Snapchat", fetch_snapchat, ("mrbeast",))
+        ("Snapchat", fetch_snapchat, ("mrbeast",)),
+        # Async streams run on the same event loop as the HTTP collectors
+        StreamCollector("Telegram", stream_telegram, ("osint_channel", 50)),
+        StreamCollector("Discord", stream_discord_messages, (30,))
         # Add more collectors here as needed
     ]
 
     print(f"Fetching data from multiple platforms to collect {total_records} total records...")
 
-    for platform_name, fetch_func, args in platforms:
-        try:
-            platform_data = fetch_func(*args)
-            normalized = [normalize_record(d, platform_name) for d in platform_data if d]
-
-            # Calculate how many more records we can take
-            remaining = total_records - len(data)
-            if remaining <= 0:
-                break  # stop if we've already collected enough
-
-            data.extend(normalized[:remaining])  # only take what's needed
-
-        except Exception as e:
-            print(f"Error fetching {platform_name}: {e}")
-
-    print(f"Collected {len(data)} records. Cleaning and enriching...")
-
-    # Clean text
-    for d in data:
-        if d.get("text"):
-            d["text"] = clean_text(d["text"])
-
-    # Filter English content
-    data = filter_english(data)
-
-    # Ensure only total_records remain
-    data = data[:total_records]
-
-    # Add sentiment
-    data = add_sentiment(data)
-    save_sentiment_chart(data, output_dir="screenshots", filename="sentiment_chart.png")
-
-    # Save to DB
-    save_to_db(data, DB_PATH)
-    print(f"✅ Saved {len(data)} normalized multi-platform records to database")
+    kept = 0
+    sentiment_cache = SentimentCache(DB_PATH, get_backend().model)
+    with NLPStage(cache=sentiment_cache) as nlp:
+        # Each stage takes and returns a batch; batches are written as soon as they get through
+        stages = [
+            lambda batch: enrich_records(batch, DB_PATH),  # unique users once per batch, cached across batches
+            normalize_records,  # cleaned text, original kept as raw_text
+            nlp,  # English filter + sentiment on a process pool
+        ]
+
+        # Collectors run concurrently; batches are processed in the order they arrive.
+        # The heartbeat lets rebatch flush a partial batch while the collectors are quiet.
+        fetched = fetch_all(platforms, heartbeat=PIPELINE_FLUSH_INTERVAL)
+        batches = rebatch(normalized_batches(fetched))
+        for batch in run_stages(batches, stages):
+            batch = batch[:total_records - kept]  # only take what's needed
+            kept += save_to_db(batch, DB_PATH)  # duplicates and failed writes don't count
+            print(f"📥 {kept}/{total_records} records saved")
+            if kept >= total_records:
+                break  # stop fetching once we have enough
+
+    print(f"🧠 Sentiment ({get_backend().name}): {sentiment_cache.summary()}")
+    print(f"✅ Saved {kept} normalized multi-platform records to database")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OSINT social media pipeline")
+    parser.add_argument("--records", type=int, default=100, help="number of records to collect")
+    parser.add_argument("--compact", action="store_true",
+                        help="remove duplicate posts already in the database and exit")
+    parser.add_argument("--hash-profiles", action="store_true",
+                        help="compute missing profile picture hashes for image search and exit")
+    parser.add_argument("--export-charts", action="store_true",
+                        help="write PNG charts of the stored data to screenshots/ and exit (needs matplotlib/seaborn)")
+    parser.add_argument("--benchmark-sentiment", action="store_true",
+                        help="compare sentiment backends with TextBlob on the stored posts and exit")
+    args = parser.parse_args()
+
     # Initialize database with new schema
     init_db(DB_PATH)
 
-    run_pipeline(100)
-    print_db_records(limit=20)
+    if args.compact:
+        compact_posts(DB_PATH)
+    elif args.hash_profiles:
+        backfill_profile_hashes(DB_PATH)
+    elif args.export_charts:
+        # Plotting stack is only imported for this optional export
+        from utils.visualizer import export_charts
+        export_charts(DB_PATH)
+    elif args.benchmark_sentiment:
+        benchmark_sentiment()
+    else:
+        run_pipeline(args.records)
+        print_db_records(limit=20)
 
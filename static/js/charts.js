@@ -0,0 +1,97 @@
+// Lightweight SVG charts for the dashboard, drawn from the /api/stats/* JSON series.
+// Replaces the server-rendered matplotlib PNGs; no plotting library is loaded.
+(function (global) {
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+    const PALETTE = ['#00ff9d', '#00ccff', '#ff00ff', '#ffff00'];
+
+    function el(name, attrs, text) {
+        const node = document.createElementNS(SVG_NS, name);
+        Object.entries(attrs || {}).forEach(([key, value]) => node.setAttribute(key, value));
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    // Round the axis maximum up to 1, 2, 2.5 or 5 times a power of ten
+    function niceMax(value) {
+        if (value <= 0) return 1;
+        const step = Math.pow(10, Math.floor(Math.log10(value)));
+        for (const m of [1, 2, 2.5, 5, 10]) {
+            if (m * step >= value) return m * step;
+        }
+        return 10 * step;
+    }
+
+    /**
+     * Grouped bar chart.
+     *   labels:  category names along the x axis
+     *   series:  [{name, values, color}]
+     *   options: {title, percent (values are 0-1 proportions), colorByBar}
+     */
+    function barChart(container, labels, series, options) {
+        options = options || {};
+        const width = 900, height = 420;
+        const margin = {top: 50, right: 20, bottom: 90, left: 60};
+        const plotW = width - margin.left - margin.right;
+        const plotH = height - margin.top - margin.bottom;
+        const values = series.flatMap(s => s.values);
+        const max = options.percent ? 1 : niceMax(Math.max(0, ...values));
+        const fmt = options.percent ? v => Math.round(v * 100) + '%' : v => String(Math.round(v));
+
+        const svg = el('svg', {viewBox: `0 0 ${width} ${height}`, width: '100%', role: 'img', 'aria-label': options.title || ''});
+        svg.appendChild(el('text', {x: width / 2, y: 28, 'text-anchor': 'middle', fill: '#00ff9d', 'font-size': 18}, options.title || ''));
+
+        if (!labels.length) {
+            svg.appendChild(el('text', {x: width / 2, y: height / 2, 'text-anchor': 'middle', fill: '#888', 'font-size': 14}, 'No data yet'));
+            container.replaceChildren(svg);
+            return;
+        }
+
+        // Grid lines and y axis labels
+        for (let i = 0; i <= 4; i++) {
+            const y = margin.top + plotH - plotH * i / 4;
+            svg.appendChild(el('line', {x1: margin.left, x2: width - margin.right, y1: y, y2: y, stroke: 'rgba(255, 255, 255, 0.1)'}));
+            svg.appendChild(el('text', {x: margin.left - 8, y: y + 4, 'text-anchor': 'end', fill: '#fff', 'font-size': 12}, fmt(max * i / 4)));
+        }
+
+        const groupW = plotW / labels.length;
+        const barW = groupW * 0.8 / series.length;
+        labels.forEach((label, i) => {
+            const x0 = margin.left + i * groupW + groupW * 0.1;
+            series.forEach((s, j) => {
+                const value = s.values[i] || 0;
+                const h = plotH * value / max;
+                const x = x0 + j * barW;
+                const y = margin.top + plotH - h;
+                const color = options.colorByBar ? PALETTE[i % PALETTE.length] : (s.color || PALETTE[j % PALETTE.length]);
+                const bar = el('rect', {x: x, y: y, width: Math.max(barW - 2, 1), height: h, fill: color, opacity: 0.85});
+                bar.appendChild(el('title', {}, `${label} · ${s.name}: ${fmt(value)}`));
+                svg.appendChild(bar);
+                if (series.length === 1) {
+                    svg.appendChild(el('text', {x: x + barW / 2, y: y - 6, 'text-anchor': 'middle', fill: '#00ff9d', 'font-size': 12}, fmt(value)));
+                }
+            });
+            const lx = x0 + groupW * 0.4, ly = margin.top + plotH + 16;
+            svg.appendChild(el('text', {x: lx, y: ly, 'text-anchor': 'end', fill: '#fff', 'font-size': 12, transform: `rotate(-45 ${lx} ${ly})`}, label));
+        });
+        svg.appendChild(el('rect', {x: margin.left, y: margin.top, width: plotW, height: plotH, fill: 'none', stroke: '#00ccff'}));
+
+        // Legend for grouped charts
+        if (series.length > 1) {
+            series.forEach((s, j) => {
+                const x = width - margin.right - 110, y = margin.top + 10 + j * 20;
+                svg.appendChild(el('rect', {x: x, y: y, width: 12, height: 12, fill: s.color || PALETTE[j % PALETTE.length]}));
+                svg.appendChild(el('text', {x: x + 18, y: y + 11, fill: '#fff', 'font-size': 12}, s.name));
+            });
+        }
+        container.replaceChildren(svg);
+    }
+
+    function load(url, container, draw) {
+        fetch(url)
+            .then(resp => resp.ok ? resp.json() : Promise.reject(resp.status))
+            .then(draw)
+            .catch(() => { container.textContent = 'Chart unavailable'; });
+    }
+
+    global.OsintCharts = {barChart: barChart, load: load};
+})(window);
@@ -1,15 +1,22 @@
-from langdetect import detect, DetectorFactory
-import re 
+from utils.language import identifier
+from utils.text_normalizer import normalize_text
 
-# Set seed for consistent results
-DetectorFactory.seed = 0
+def clean_text(text, is_html=False):
+    """Remove URLs, symbols (and HTML tags) from text; see utils.text_normalizer"""
+    return normalize_text(text, is_html)
 
-def clean_text(text): 
+def record_text(record):
+    """A record's text as a non-empty string, or None if there is nothing to analyze"""
+    text = record.get("text")
     if text is None:
-        return ""
-    text = re.sub(r"http\S+", "", text)  # remove URLs 
-    text = re.sub(r"[^A-Za-z0-9\s]", "", text)  # remove symbols  
-    return text.strip()
+        return None
+    # Convert to string if it's not already
+    if not isinstance(text, str):
+        try:
+            text = str(text)
+        except Exception:
+            return None
+    return text if text.strip() else None
 
 def filter_english(records):
     """
@@ -17,35 +24,22 @@ def filter_english(records):
     """
     if records is None:
         return []
-    
+
+    # Skip records without usable text
+    candidates = [(r, record_text(r)) for r in records]
+    candidates = [(r, text) for r, text in candidates if text is not None]
+
+    # One batched call: trivial/obvious texts skip the detector, repeats hit the cache
+    detections = identifier.detect_batch(text for _, text in candidates)
+
     results = []
-    
-    for r in records:
-        # Skip if record doesn't have a text field or text is None
-        if "text" not in r or r["text"] is None:
-            continue
-            
-        text = r["text"]
-        
-        # Convert to string if it's not already
-        if not isinstance(text, str):
-            try:
-                text = str(text)
-            except:
-                continue
-                
-        # Skip empty strings
-        if not text.strip():
-            continue
-            
-        try:
-            # Try to detect language
-            lang = detect(text)
-            if lang == "en":
-                results.append(r)
-        except Exception as e:
-            # Skip records where language detection fails
-            print(f"Language detection failed for text: {text[:100]}... Error: {e}")
-            continue
-            
+    undetected = 0
+    for (r, _), (lang, _) in zip(candidates, detections):
+        if lang == "en":
+            results.append(r)
+        elif lang is None:
+            undetected += 1
+
+    if undetected:
+        print(f"⚠️ Language detection found no language in {undetected} record(s)")
     return results
\ No newline at end of file
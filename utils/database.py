@@ -1,13 +1,503 @@
+import base64
+import hashlib
+import json
+import os
+import re
 import sqlite3
 from pathlib import Path
 from datetime import datetime
 
+from utils.image_hashing import hash_image_urls
+from utils.sentiment import sentiment_label
+
+POST_COLUMNS = [
+    "platform", "user", "username", "name", "email",
+    "profile_pic", "timestamp", "text", "url",
+    "polarity", "subjectivity", "sentiment_label"
+]
+# Columns that are not TEXT (older databases get them added with these types)
+POST_COLUMN_TYPES = {"polarity": "REAL", "subjectivity": "REAL"}
+TIMESTAMP_INDEX = POST_COLUMNS.index("timestamp")
+REAL_INDEXES = [POST_COLUMNS.index(col) for col in POST_COLUMN_TYPES]
+LABEL_INDEX = POST_COLUMNS.index("sentiment_label")
+
+# Posts are stored once per fingerprint; re-collected posts are ignored. The
+# explicit check also covers databases whose fingerprint index is not unique yet
+# (duplicates from older versions that --compact has not removed)
+INSERT_POST_SQL = f"""
+    INSERT OR IGNORE INTO social_media_posts ({', '.join(POST_COLUMNS)}, fingerprint)
+    SELECT {', '.join('?' for _ in POST_COLUMNS)}, ?
+    WHERE NOT EXISTS (SELECT 1 FROM social_media_posts WHERE fingerprint = ?)
+"""
+
+# Databases whose schema has already been checked by this process
+_schema_ready = set()
+
+# Per-connection performance settings, overridable from .env
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # 64 MB page cache
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+
+def connect(db_path):
+    """
+    Open a connection with the performance profile applied.
+    WAL mode itself is persistent and set once by init_db; the pragmas below
+    are per-connection so every reader and writer goes through here.
+    """
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def _migration_1_indexes(c):
+    """Indexes for the home feed ordering and per-user post lookups"""
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_platform_username_timestamp
+        ON social_media_posts (platform, username, timestamp)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_timestamp
+        ON social_media_posts (timestamp)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_details_history_user
+        ON user_details_history (platform, username)
+    """)
+
+def post_fingerprint(record):
+    """
+    Stable identity for a post: its URL when it has one, otherwise a hash of
+    platform + username + text + timestamp
+    """
+    platform = str(record.get("platform") or "").strip().lower()
+    url = str(record.get("url") or "").strip()
+    if url:
+        key = f"url\x1f{platform}\x1f{url}"
+    else:
+        key = "\x1f".join([
+            "post", platform,
+            str(record.get("username") or ""),
+            str(record.get("text") or ""),
+            str(record.get("timestamp") or ""),
+        ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _backfill_fingerprints(c):
+    """Compute fingerprints for rows stored without one"""
+    rows = c.execute("""
+        SELECT rowid, platform, username, text, timestamp, url
+        FROM social_media_posts
+        WHERE fingerprint IS NULL
+    """).fetchall()
+    columns = ["rowid", "platform", "username", "text", "timestamp", "url"]
+    c.executemany(
+        "UPDATE social_media_posts SET fingerprint = ? WHERE rowid = ?",
+        [(post_fingerprint(dict(zip(columns, row))), row[0]) for row in rows]
+    )
+    return len(rows)
+
+def _dedupe_posts(c):
+    """
+    Fingerprint unmarked rows, keep the first stored copy of every fingerprint
+    and (re)build the unique index. Returns the number of rows removed.
+    """
+    # The index is dropped first so backfilled rows can't collide with it
+    c.execute("DROP INDEX IF EXISTS idx_posts_fingerprint")
+    _backfill_fingerprints(c)
+    c.execute("""
+        DELETE FROM social_media_posts
+        WHERE fingerprint IS NOT NULL
+          AND rowid NOT IN (
+              SELECT MIN(rowid) FROM social_media_posts
+              WHERE fingerprint IS NOT NULL
+              GROUP BY fingerprint
+          )
+    """)
+    removed = c.rowcount
+    c.execute("""
+        CREATE UNIQUE INDEX idx_posts_fingerprint
+        ON social_media_posts (fingerprint)
+    """)
+    return removed
+
+def _migration_2_fingerprints(c):
+    """
+    Fingerprint column and index so each post is stored once. Nothing is
+    deleted here: if older duplicates exist the index stays non-unique until
+    compact_posts (main.py --compact) removes them.
+    """
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(social_media_posts);").fetchall()]
+    if "fingerprint" not in existing_cols:
+        c.execute("ALTER TABLE social_media_posts ADD COLUMN fingerprint TEXT")
+    _backfill_fingerprints(c)
+    duplicates = c.execute("""
+        SELECT COUNT(*) - COUNT(DISTINCT fingerprint) FROM social_media_posts
+        WHERE fingerprint IS NOT NULL
+    """).fetchone()[0]
+    unique = "UNIQUE " if not duplicates else ""
+    c.execute(f"""
+        CREATE {unique}INDEX IF NOT EXISTS idx_posts_fingerprint
+        ON social_media_posts (fingerprint)
+    """)
+    if duplicates:
+        print(f"⚠️ Found {duplicates} duplicate posts stored by an older version; "
+              f"run `python main.py --compact` to remove them")
+
+# Columns indexed for full-text search; tables are kept in sync by triggers
+POSTS_FTS_COLUMNS = ["text", "name", "username", "email", "profile_pic"]
+USERS_FTS_COLUMNS = ["name", "username", "email", "bio", "location"]
+
+def _create_fts(c, fts_table, content_table, columns):
+    """External-content FTS5 table plus insert/update/delete sync triggers"""
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{col}" for col in columns)
+    old_cols = ", ".join(f"old.{col}" for col in columns)
+    c.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {cols}, content='{content_table}', tokenize='unicode61', prefix='2 3'
+        )
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    # Index rows that already exist
+    c.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+def _migration_3_full_text_search(c):
+    """FTS5 indexes over posts and user details for /search"""
+    _create_fts(c, "posts_fts", "social_media_posts", POSTS_FTS_COLUMNS)
+    _create_fts(c, "users_fts", "user_details", USERS_FTS_COLUMNS)
+
+def build_fts_query(text):
+    """
+    Turn free-form user input into a safe FTS5 prefix query,
+    e.g. 'john doe' -> '"john"* "doe"*' (all terms must match)
+    """
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms[:16])
+
+def _migration_4_profile_hashes(c):
+    """Stored phash of each profile picture and the URL it was computed from"""
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(user_details);").fetchall()]
+    if "phash" not in existing_cols:
+        c.execute("ALTER TABLE user_details ADD COLUMN phash TEXT")
+    if "phash_url" not in existing_cols:
+        c.execute("ALTER TABLE user_details ADD COLUMN phash_url TEXT")
+
+def _migration_5_profile_hash_watermark(c):
+    """When each phash was written, so the image index can load changes incrementally"""
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(user_details);").fetchall()]
+    if "phash_updated" not in existing_cols:
+        c.execute("ALTER TABLE user_details ADD COLUMN phash_updated TEXT")
+    c.execute("UPDATE user_details SET phash_updated = last_updated WHERE phash IS NOT NULL")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_details_phash_updated
+        ON user_details (phash_updated)
+    """)
+
+def _migration_6_extra_image_hashes(c):
+    """dhash and whash next to phash for combined image scoring"""
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(user_details);").fetchall()]
+    for col in ("dhash", "whash"):
+        if col not in existing_cols:
+            c.execute(f"ALTER TABLE user_details ADD COLUMN {col} TEXT")
+
+def _migration_7_feed_cursor(c):
+    """
+    Keyset pagination orders the feed by (timestamp, rowid); NULL timestamps
+    would never compare below a cursor, so store them as ''
+    """
+    c.execute("UPDATE social_media_posts SET timestamp = '' WHERE timestamp IS NULL")
+
+def _post_day_sql(ts):
+    """
+    SQL expression for a post's calendar day (YYYY-MM-DD, '' if unknown) from the
+    timestamp formats collectors store: ISO strings, epoch seconds and
+    Twitter's 'Wed Oct 10 20:19:24 +0000 2018'
+    """
+    return f"""(CASE
+        WHEN {ts} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*' THEN substr({ts}, 1, 10)
+        WHEN typeof({ts}) IN ('integer', 'real')
+             OR ({ts} GLOB '[0-9]*' AND {ts} NOT GLOB '*[^0-9.]*') THEN date(CAST({ts} AS REAL), 'unixepoch')
+        WHEN {ts} GLOB '[A-Z][a-z][a-z] [A-Z][a-z][a-z] [0-9][0-9] *' THEN
+             substr({ts}, -4) || '-'
+             || printf('%02d', (instr('JanFebMarAprMayJunJulAugSepOctNovDec', substr({ts}, 5, 3)) + 2) / 3)
+             || '-' || substr({ts}, 9, 2)
+        ELSE ''
+    END)"""
+
+def _stats_terms(row):
+    """Column expressions of a posts row (new/old/table name) used by the aggregate tables"""
+    label = f"{row}.sentiment_label"
+    return {
+        "platform": f"COALESCE({row}.platform, '')",
+        "username": f"COALESCE({row}.username, '')",
+        "day": _post_day_sql(f"{row}.timestamp"),
+        "positive": f"({label} IS 'Positive')",
+        "neutral": f"({label} IS 'Neutral')",
+        "negative": f"({label} IS 'Negative')",
+    }
+
+def _stats_add_sql(row):
+    """Trigger body adding one post to the aggregate tables"""
+    t = _stats_terms(row)
+    return f"""
+        INSERT INTO stats_platform (platform, posts, users)
+        VALUES ({t['platform']}, 1, {t['username']} != '' AND NOT EXISTS (
+            SELECT 1 FROM stats_platform_user WHERE platform = {t['platform']} AND username = {t['username']}))
+        ON CONFLICT(platform) DO UPDATE SET posts = posts + 1, users = users + excluded.users;
+        INSERT INTO stats_platform_user (platform, username, posts)
+        SELECT {t['platform']}, {t['username']}, 1 WHERE {t['username']} != ''
+        ON CONFLICT(platform, username) DO UPDATE SET posts = posts + 1;
+        UPDATE stats_totals SET value = value + 1 WHERE name = 'posts';
+        UPDATE stats_totals SET value = value + 1
+        WHERE name = 'users' AND {t['username']} != ''
+            AND NOT EXISTS (SELECT 1 FROM stats_user WHERE username = {t['username']});
+        INSERT INTO stats_user (username, posts)
+        SELECT {t['username']}, 1 WHERE {t['username']} != ''
+        ON CONFLICT(username) DO UPDATE SET posts = posts + 1;
+        INSERT INTO stats_sentiment_daily (platform, day, posts, positive, neutral, negative)
+        VALUES ({t['platform']}, {t['day']}, 1, {t['positive']}, {t['neutral']}, {t['negative']})
+        ON CONFLICT(platform, day) DO UPDATE SET
+            posts = posts + 1,
+            positive = positive + excluded.positive,
+            neutral = neutral + excluded.neutral,
+            negative = negative + excluded.negative;
+    """
+
+def _stats_remove_sql(row):
+    """Trigger body removing one post from the aggregate tables"""
+    t = _stats_terms(row)
+    user_row = f"platform = {t['platform']} AND username = {t['username']}"
+    day_row = f"platform = {t['platform']} AND day = {t['day']}"
+    return f"""
+        UPDATE stats_platform SET posts = posts - 1 WHERE platform = {t['platform']};
+        UPDATE stats_platform_user SET posts = posts - 1 WHERE {user_row};
+        UPDATE stats_platform SET users = users - 1
+        WHERE platform = {t['platform']}
+            AND EXISTS (SELECT 1 FROM stats_platform_user WHERE {user_row} AND posts <= 0);
+        DELETE FROM stats_platform_user WHERE {user_row} AND posts <= 0;
+        DELETE FROM stats_platform WHERE platform = {t['platform']} AND posts <= 0;
+        UPDATE stats_totals SET value = value - 1 WHERE name = 'posts';
+        UPDATE stats_user SET posts = posts - 1 WHERE username = {t['username']};
+        UPDATE stats_totals SET value = value - 1
+        WHERE name = 'users'
+            AND EXISTS (SELECT 1 FROM stats_user WHERE username = {t['username']} AND posts <= 0);
+        DELETE FROM stats_user WHERE username = {t['username']} AND posts <= 0;
+        UPDATE stats_sentiment_daily SET
+            posts = posts - 1,
+            positive = positive - {t['positive']},
+            neutral = neutral - {t['neutral']},
+            negative = negative - {t['negative']}
+        WHERE {day_row};
+        DELETE FROM stats_sentiment_daily WHERE {day_row} AND posts <= 0;
+    """
+
+def _rebuild_stats(c):
+    """Recompute every aggregate table from social_media_posts"""
+    t = _stats_terms("p")
+    for table in ("stats_platform", "stats_platform_user", "stats_user", "stats_totals", "stats_sentiment_daily"):
+        c.execute(f"DELETE FROM {table}")
+    c.execute(f"""
+        INSERT INTO stats_platform_user (platform, username, posts)
+        SELECT {t['platform']}, {t['username']}, COUNT(*) FROM social_media_posts p
+        WHERE {t['username']} != ''
+        GROUP BY 1, 2
+    """)
+    c.execute("""
+        INSERT INTO stats_user (username, posts)
+        SELECT username, SUM(posts) FROM stats_platform_user GROUP BY username
+    """)
+    c.execute(f"""
+        INSERT INTO stats_platform (platform, posts, users)
+        SELECT {t['platform']}, COUNT(*), COUNT(DISTINCT NULLIF({t['username']}, ''))
+        FROM social_media_posts p
+        GROUP BY 1
+    """)
+    c.execute("""
+        INSERT INTO stats_totals (name, value) VALUES
+            ('posts', (SELECT COUNT(*) FROM social_media_posts)),
+            ('users', (SELECT COUNT(*) FROM stats_user))
+    """)
+    c.execute(f"""
+        INSERT INTO stats_sentiment_daily (platform, day, posts, positive, neutral, negative)
+        SELECT {t['platform']}, {t['day']}, COUNT(*), SUM({t['positive']}), SUM({t['neutral']}), SUM({t['negative']})
+        FROM social_media_posts p
+        GROUP BY 1, 2
+    """)
+
+def _migration_8_dashboard_stats(c):
+    """
+    Aggregate tables for the dashboard (post/user counts per platform and
+    sentiment buckets per platform per day), kept current by triggers on
+    social_media_posts so reads never scan the posts table
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stats_platform (
+            platform TEXT PRIMARY KEY,
+            posts INTEGER NOT NULL DEFAULT 0,
+            users INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stats_platform_user (
+            platform TEXT NOT NULL,
+            username TEXT NOT NULL,
+            posts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, username)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stats_user (
+            username TEXT PRIMARY KEY,
+            posts INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stats_sentiment_daily (
+            platform TEXT NOT NULL,
+            day TEXT NOT NULL,
+            posts INTEGER NOT NULL DEFAULT 0,
+            positive INTEGER NOT NULL DEFAULT 0,
+            neutral INTEGER NOT NULL DEFAULT 0,
+            negative INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, day)
+        ) WITHOUT ROWID
+    """)
+    _create_stats_triggers(c)
+    _rebuild_stats(c)
+
+def _create_stats_triggers(c):
+    """Triggers applying every posts insert, delete and relevant update to the aggregate tables"""
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_posts_ai AFTER INSERT ON social_media_posts BEGIN
+            {_stats_add_sql("new")}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_posts_ad AFTER DELETE ON social_media_posts BEGIN
+            {_stats_remove_sql("old")}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_posts_au
+        AFTER UPDATE OF platform, username, timestamp, sentiment_label ON social_media_posts BEGIN
+            {_stats_remove_sql("old")}
+            {_stats_add_sql("new")}
+        END
+    """)
+
+def _migration_9_sentiment_cache(c):
+    """
+    Sentiment scores keyed by model version and a hash of the cleaned text,
+    so re-collected posts are not scored again (see utils.sentiment_cache)
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS sentiment_cache (
+            model TEXT NOT NULL,
+            text_hash BLOB NOT NULL,
+            polarity REAL NOT NULL,
+            subjectivity REAL NOT NULL,
+            PRIMARY KEY (model, text_hash)
+        ) WITHOUT ROWID
+    """)
+
+def _migration_10_sentiment_columns(c):
+    """
+    Numeric polarity/subjectivity in REAL columns and the label in its own
+    indexed column. The old sentiment column held label text on some databases
+    and scores on others; its values are moved over and it is cleared.
+    """
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(social_media_posts);").fetchall()]
+    for col in ("polarity", "subjectivity", "sentiment_label"):
+        if col not in existing_cols:
+            c.execute(f"ALTER TABLE social_media_posts ADD COLUMN {col} {POST_COLUMN_TYPES.get(col, 'TEXT')}")
+
+    # Stats follow sentiment_label now; recreated after the rows are moved
+    for trigger in ("stats_posts_ai", "stats_posts_ad", "stats_posts_au"):
+        c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    if "sentiment" in existing_cols:
+        updates = []
+        for rowid, value in c.execute(
+                "SELECT rowid, sentiment FROM social_media_posts WHERE sentiment IS NOT NULL").fetchall():
+            if value in ("Positive", "Negative", "Neutral"):
+                updates.append((None, value, rowid))
+            else:
+                polarity = _to_float(value)
+                updates.append((polarity, None if polarity is None else sentiment_label(polarity), rowid))
+        c.executemany("""
+            UPDATE social_media_posts
+            SET polarity = COALESCE(?, polarity), sentiment_label = COALESCE(?, sentiment_label), sentiment = NULL
+            WHERE rowid = ?
+        """, updates)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_sentiment_label
+        ON social_media_posts (sentiment_label, timestamp)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_posts_polarity
+        ON social_media_posts (polarity)
+    """)
+    _create_stats_triggers(c)
+    _rebuild_stats(c)
+
+# (version, migration) pairs applied in order; PRAGMA user_version records progress
+MIGRATIONS = [
+    (1, _migration_1_indexes),
+    (2, _migration_2_fingerprints),
+    (3, _migration_3_full_text_search),
+    (4, _migration_4_profile_hashes),
+    (5, _migration_5_profile_hash_watermark),
+    (6, _migration_6_extra_image_hashes),
+    (7, _migration_7_feed_cursor),
+    (8, _migration_8_dashboard_stats),
+    (9, _migration_9_sentiment_cache),
+    (10, _migration_10_sentiment_columns),
+]
+
+def _run_migrations(conn):
+    """Bring an existing database up to the latest schema version in place"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in MIGRATIONS:
+        if version >= target:
+            continue
+        c = conn.cursor()
+        migration(c)
+        c.execute(f"PRAGMA user_version = {target}")
+        conn.commit()
+        print(f"✅ Migrated database schema to v{target}")
+
 def init_db(db_path):
     """Initialize database with required tables"""
     db_dir = Path(db_path).parent
     db_dir.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
+    # WAL lets the Flask reader and the pipeline writer work at the same time
+    conn.execute("PRAGMA journal_mode = WAL")
     c = conn.cursor()
 
     # Create posts table
@@ -23,7 +513,9 @@ def init_db(db_path):
             timestamp TEXT,
             text TEXT,
             url TEXT,
-            sentiment REAL
+            polarity REAL,
+            subjectivity REAL,
+            sentiment_label TEXT
         )
     """)
 
@@ -62,61 +554,137 @@ def init_db(db_path):
         )
     """)
 
+    # Add columns missing from databases created by older versions
+    existing_cols = [r[1] for r in c.execute("PRAGMA table_info(social_media_posts);").fetchall()]
+    for col in POST_COLUMNS:
+        if col not in existing_cols:
+            try:
+                c.execute(f"ALTER TABLE social_media_posts ADD COLUMN {col} {POST_COLUMN_TYPES.get(col, 'TEXT')};")
+                print(f"✅ Added missing column: {col}")
+            except sqlite3.OperationalError:
+                pass  # ignore if already exists
+
     conn.commit()
+    _run_migrations(conn)
     conn.close()
+    _schema_ready.add(str(Path(db_path).resolve()))
 
-def save_user_details(user_data, db_path):
-    """Save or update user details in the database"""
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def ensure_schema(db_path):
+    """Run init_db once per process for a given database"""
+    if str(Path(db_path).resolve()) not in _schema_ready:
+        init_db(db_path)
 
-    # Add current timestamp
-    user_data["last_updated"] = datetime.now().isoformat()
+USER_COLUMNS = ["platform", "username", "name", "email", "profile_pic",
+                "bio", "location", "followers", "following", "last_updated"]
 
-    # Insert or update user details
-    columns = ["platform", "username", "name", "email", "profile_pic", 
-               "bio", "location", "followers", "following", "last_updated"]
-    
-    placeholders = ", ".join("?" * len(columns))
-    update_stmt = ", ".join(f"{col} = ?" for col in columns)
-    values = [user_data.get(col, "") for col in columns]
+# Fields compared to decide whether a snapshot differs from the stored row
+SNAPSHOT_COLUMNS = USER_COLUMNS[2:-1]
 
-    # Insert or update current user_details
-    # If a row exists for platform+username, update it; otherwise insert
-    try:
-        c.execute(f"SELECT id FROM user_details WHERE platform = ? AND username = ?", 
-                  (user_data['platform'], user_data['username']))
-        existing = c.fetchone()
-        if existing:
-            # Update existing current record
-            c.execute(f"""
-                UPDATE user_details 
-                SET {update_stmt}
-                WHERE platform = ? AND username = ?
-            """, values + [user_data["platform"], user_data["username"]])
-        else:
-            c.execute(f"""
-                INSERT INTO user_details ({", ".join(columns)})
-                VALUES ({placeholders})
-            """, values)
-    except Exception as e:
-        print(f"Error saving user_details: {e}")
+UPSERT_USER_SQL = f"""
+    INSERT INTO user_details ({", ".join(USER_COLUMNS)})
+    VALUES ({", ".join("?" for _ in USER_COLUMNS)})
+    ON CONFLICT(platform, username) DO UPDATE SET
+        {", ".join(f"{col} = excluded.{col}" for col in USER_COLUMNS[2:])}
+"""
+
+INSERT_USER_HISTORY_SQL = f"""
+    INSERT INTO user_details_history ({", ".join(USER_COLUMNS)})
+    VALUES ({", ".join("?" for _ in USER_COLUMNS)})
+"""
+
+def _snapshot(values):
+    """Comparable form of the snapshot fields (ignores type differences like 5 vs '5')"""
+    return tuple("" if v is None else str(v) for v in values)
+
+UPDATE_PROFILE_HASH_SQL = """
+    UPDATE user_details
+    SET phash = ?, dhash = ?, whash = ?, phash_url = ?, phash_updated = ?
+    WHERE platform = ? AND username = ?
+"""
+
+def _hash_values(hashes):
+    hashes = hashes or {}
+    return (hashes.get("phash"), hashes.get("dhash"), hashes.get("whash"))
 
-    # Always append to history table (preserve snapshots)
+def _profile_hash_updates(conn, rows):
+    """
+    Hash profile pictures that are new or whose URL changed since they were
+    last hashed. Returns parameters for UPDATE_PROFILE_HASH_SQL.
+    """
+    state = _fetch_user_rows(conn, list(rows), columns=["platform", "username", "phash_url"])
+    pending = {}
+    for key, values in rows.items():
+        url = values[USER_COLUMNS.index("profile_pic")] or ""
+        if url != (state.get(key, {}).get("phash_url") or ""):
+            pending[key] = url
+    hashes = hash_image_urls(pending.values())
+
+    now = datetime.now().isoformat()
+    updates = []
+    for (platform, username), url in pending.items():
+        image_hashes = hashes.get(url)
+        # Leave phash_url unset on failed downloads so the next run retries
+        hashed_url = url if (image_hashes or not url) else None
+        updates.append((*_hash_values(image_hashes), hashed_url, now, platform, username))
+    return updates
+
+def save_user_details_many(users, db_path, skip_unchanged=True, hash_images=True):
+    """
+    Upsert many user_details rows and append their history in one transaction
+
+    Args:
+        users: Iterable of user detail dicts (platform and username required)
+        db_path: Path to the SQLite database
+        skip_unchanged: Don't append a history row when no field changed
+        hash_images: Compute and store image hashes of new or changed profile pictures
+
+    Returns:
+        int: Number of history snapshots appended
+    """
+    now = datetime.now().isoformat()
+    rows = {}
+    for user_data in users:
+        if not user_data.get("platform") or not user_data.get("username"):
+            continue
+        user_data["last_updated"] = now
+        values = [user_data.get(col, "") for col in USER_COLUMNS]
+        rows[(values[0], values[1])] = values  # last snapshot per user wins
+    if not rows:
+        return 0
+
+    conn = connect(db_path)
     try:
-        hist_cols = columns
-        hist_placeholders = ", ".join("?" for _ in hist_cols)
-        hist_values = [user_data.get(col, "") for col in hist_cols]
-        c.execute(f"INSERT INTO user_details_history ({', '.join(hist_cols)}) VALUES ({hist_placeholders})", hist_values)
-    except Exception as e:
-        print(f"Error saving user_details_history: {e}")
+        # Downloads happen before the write transaction so it stays short
+        hash_updates = _profile_hash_updates(conn, rows) if hash_images else []
+        with conn:
+            history = list(rows.values())
+            if skip_unchanged:
+                existing = _fetch_user_rows(conn, list(rows))
+                history = [
+                    values for key, values in rows.items()
+                    if key not in existing
+                    or _snapshot(values[2:-1]) != _snapshot(existing[key][col] for col in SNAPSHOT_COLUMNS)
+                ]
+            # Unchanged users still get last_updated refreshed for the enrichment cache
+            conn.executemany(UPSERT_USER_SQL, list(rows.values()))
+            if history:
+                conn.executemany(INSERT_USER_HISTORY_SQL, history)
+            if hash_updates:
+                conn.executemany(UPDATE_PROFILE_HASH_SQL, hash_updates)
+        return len(history)
+    except sqlite3.Error as e:
+        print(f"Error saving user_details: {e}")
+        return 0
+    finally:
+        conn.close()
 
-    conn.commit()
-    conn.close()
+def save_user_details(user_data, db_path):
+    """Save or update user details in the database"""
+    save_user_details_many([user_data], db_path, skip_unchanged=False)
 
 def get_user_details(platform, username, db_path):
     """Retrieve user details from the database"""
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     c = conn.cursor()
 
     c.execute("""
@@ -135,69 +703,231 @@ def get_user_details(platform, username, db_path):
         return dict(zip(columns, row))
     return None
 
+def _fetch_user_rows(conn, keys, updated_since=None, columns=None):
+    """Look up user_details rows for (platform, username) keys on an open connection"""
+    columns = columns or USER_COLUMNS
+    found = {}
+    # Chunk to stay under SQLite's bound-parameter limit
+    for i in range(0, len(keys), 400):
+        chunk = keys[i:i + 400]
+        query = f"""
+            SELECT {", ".join(columns)}
+            FROM user_details
+            WHERE (platform, username) IN (VALUES {", ".join("(?, ?)" for _ in chunk)})
+        """
+        params = [v for key in chunk for v in key]
+        if updated_since:
+            query += " AND last_updated >= ?"
+            params.append(updated_since)
+        for row in conn.execute(query, params):
+            found[(row[0], row[1])] = dict(zip(columns, row))
+    return found
+
+def get_user_details_many(keys, db_path, updated_since=None):
+    """
+    Retrieve user details for many (platform, username) pairs at once
+
+    Args:
+        keys: Iterable of (platform, username) tuples
+        db_path: Path to the SQLite database
+        updated_since: Optional ISO timestamp; older rows are treated as missing
+
+    Returns:
+        dict mapping (platform, username) to a user details dict
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    conn = connect(db_path)
+    try:
+        return _fetch_user_rows(conn, keys, updated_since)
+    except sqlite3.Error as e:
+        print(f"Error reading user_details: {e}")
+        return {}
+    finally:
+        conn.close()
+
+def _to_float(value):
+    """Coerce a sentiment score to float, or None if it isn't numeric"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _db_value(value):
+    """A value SQLite can bind; anything else is stored as its text form"""
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
 def save_to_db(data, db_path):
-    """Save social media posts and user details to database"""
-    db_dir = Path(db_path).parent
-    db_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Save a batch of social media posts in a single transaction
+
+    Returns:
+        int: Number of rows inserted
+    """
+    ensure_schema(db_path)
+
+    rows = []
+    missing_user = 0
+    for record in data:
+        if not any([record.get("username"), record.get("name"), record.get("profile_pic")]):
+            missing_user += 1
 
-    # Initialize database tables
-    init_db(db_path)
+        # One odd collector value must not fail the whole batch's insert
+        values = [_db_value(record.get(col, "")) for col in POST_COLUMNS]
+        # Never NULL, so every post can be reached by the feed cursor
+        values[TIMESTAMP_INDEX] = values[TIMESTAMP_INDEX] or ""
+        # Scores are stored as REAL or NULL, the label as text or NULL
+        for i in REAL_INDEXES:
+            values[i] = _to_float(values[i])
+        values[LABEL_INDEX] = values[LABEL_INDEX] or None
+        fingerprint = post_fingerprint(record)
+        values += [fingerprint, fingerprint]
+        rows.append(values)
 
-    columns = [
-        "platform", "user", "username", "name", "email",
-        "profile_pic", "timestamp", "text", "url", "sentiment"
-    ]
+    if missing_user:
+        print(f"⚠️ Warning: {missing_user} record(s) missing username/name/profile_pic")
+    if not rows:
+        return 0
 
+    conn = connect(db_path)
     try:
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        with conn:
+            cursor = conn.executemany(INSERT_POST_SQL, rows)
+        inserted = cursor.rowcount
+        print(f"✅ Saved records. inserted rows={inserted}, skipped duplicates={len(rows) - inserted}")
+        return inserted
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return 0
+    finally:
+        conn.close()
 
-        # Attempt to add missing columns if any
-        existing_cols = [r[1] for r in c.execute("PRAGMA table_info(social_media_posts);").fetchall()]
-        for col in columns:
-            if col not in existing_cols:
-                try:
-                    c.execute(f"ALTER TABLE social_media_posts ADD COLUMN {col} TEXT;")
-                    print(f"✅ Added missing column: {col}")
-                except sqlite3.OperationalError:
-                    pass  # ignore if already exists
-
-        for record in data:
-            username = record.get("username", "")
-            name = record.get("name", "")
-            email = record.get("email", "")
-            profile_pic = record.get("profile_pic", "")
-            platform = record.get("platform", "")
-            text = record.get("text", "")
-            timestamp = record.get("timestamp", "")
-            url = record.get("url", "")
-
-            # (Append-only) We no longer skip duplicates here; always insert new post rows
-
-            if not any([username, name, profile_pic]):
-                print(f"⚠️ Warning: Missing username/name/profile_pic for a record on {platform}")
-
-            values = [record.get(col, "") for col in columns]
-            # Ensure sentiment is stored as float or NULL
-            try:
-                if values[-1] == "":
-                    values[-1] = None
-                else:
-                    values[-1] = float(values[-1])
-            except Exception:
-                values[-1] = None
-
-            c.execute(f"""
-                INSERT INTO social_media_posts ({', '.join(columns)})
-                VALUES ({', '.join('?' for _ in columns)})
-            """, values)
+# Newest-first feed page; the row-value comparison seeks on idx_posts_timestamp
+POSTS_PAGE_SQL = """
+    SELECT p.rowid AS post_rowid, p.*, u.followers, u.following, u.bio
+    FROM social_media_posts p
+    LEFT JOIN user_details u
+        ON p.username = u.username
+        AND p.platform = u.platform
+    {where}
+    ORDER BY p.timestamp DESC, p.rowid DESC
+    LIMIT ?
+"""
 
-        conn.commit()
-        # Count rows in social_media_posts to show appended records (quick feedback)
-        inserted = c.execute("SELECT COUNT(*) FROM social_media_posts").fetchone()[0]
-        print(f"✅ Saved records. total rows in social_media_posts={inserted}")
+def encode_cursor(timestamp, rowid):
+    """Opaque cursor pointing just after the given post"""
+    raw = json.dumps([timestamp, rowid], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, rowid = json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(rowid, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return timestamp, rowid
+
+def get_posts_page(conn, limit, cursor=None):
+    """
+    One page of the feed, newest first, using keyset pagination on
+    (timestamp, rowid) so every page costs the same regardless of offset
+
+    Args:
+        conn: Open connection with row_factory = sqlite3.Row
+        limit: Maximum posts to return
+        cursor: Value from a previous page's next cursor, or None for the first page
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    if cursor:
+        timestamp, rowid = decode_cursor(cursor)
+        sql = POSTS_PAGE_SQL.format(where="WHERE (p.timestamp, p.rowid) < (?, ?)")
+        params = (timestamp, rowid, limit + 1)
+    else:
+        sql = POSTS_PAGE_SQL.format(where="")
+        params = (limit + 1,)
+
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["timestamp"], last["post_rowid"])
+    return rows, next_cursor
 
+def compact_posts(db_path):
+    """
+    One-time cleanup for databases filled before posts were deduplicated:
+    fingerprints any unmarked rows, deletes duplicate posts and reclaims space
+
+    Returns:
+        int: Number of duplicate rows removed
+    """
+    ensure_schema(db_path)
+    conn = connect(db_path)
+    try:
+        with conn:
+            removed = _dedupe_posts(conn.cursor())
+        conn.execute("VACUUM")
+        print(f"🧹 Compacted social_media_posts: removed {removed} duplicate rows")
+        return removed
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return 0
+    finally:
+        conn.close()
+
+def backfill_profile_hashes(db_path, batch_size=200):
+    """
+    Hash profile pictures of users stored before image hashes were recorded
+    (or whose last download failed)
+
+    Returns:
+        int: Number of profiles hashed
+    """
+    ensure_schema(db_path)
+    conn = connect(db_path)
+    hashed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = conn.execute("""
+                SELECT id, platform, username, profile_pic FROM user_details
+                WHERE id > ? AND profile_pic IS NOT NULL AND profile_pic != ''
+                  AND (phash_url IS NULL OR phash_url != profile_pic OR dhash IS NULL)
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            hashes = hash_image_urls(row[3] for row in rows)
+            now = datetime.now().isoformat()
+            updates = [(*_hash_values(hashes[url]), url, now, platform, username)
+                       for _, platform, username, url in rows if hashes.get(url)]
+            with conn:
+                conn.executemany(UPDATE_PROFILE_HASH_SQL, updates)
+            hashed += len(updates)
+            print(f"🖼️ Hashed {hashed} profile pictures so far")
     except sqlite3.Error as e:
         print(f"❌ Database error: {e}")
     finally:
         conn.close()
+    return hashed
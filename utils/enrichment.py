@@ -0,0 +1,83 @@
+"""
+Batched user enrichment stage.
+Dedupes (platform, username) pairs across a batch of normalized records, reuses
+user_details rows that are still fresh, and fetches the rest concurrently.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.database import get_user_details_many, save_user_details_many
+from utils.user_details_collector import enrich_user_data
+
+# Cached user_details rows younger than this are reused without a network call
+ENRICH_TTL_HOURS = float(os.getenv("ENRICH_TTL_HOURS", "24"))
+ENRICH_MAX_WORKERS = int(os.getenv("ENRICH_MAX_WORKERS", "8"))
+
+USER_FIELDS = ["name", "email", "profile_pic", "bio", "location"]
+
+
+def _fetch_user(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """User details for a key, or None when the lookup failed or came back blank"""
+    platform, username = key
+    user_data = enrich_user_data(platform, username)
+    # Errors, rate limits and unknown users all come back as an empty profile
+    if not any(user_data.get(field) for field in USER_FIELDS + ["followers", "following"]):
+        return None
+    # Keep the record's platform spelling so user_details joins back onto posts
+    details = {"platform": platform, "username": username}
+    details.update({field: user_data.get(field, "") for field in USER_FIELDS})
+    details["followers"] = user_data.get("followers", 0)
+    details["following"] = user_data.get("following", 0)
+    return details
+
+
+def enrich_records(records: List[dict], db_path,
+                   ttl_hours: float = ENRICH_TTL_HOURS,
+                   max_workers: int = ENRICH_MAX_WORKERS) -> List[dict]:
+    """
+    Enrich normalized records with user details in one batch
+
+    Args:
+        records: Normalized post records (see main.normalize_record)
+        db_path: Path to the SQLite database holding user_details
+        ttl_hours: Max age of a cached user_details row before it is refetched
+        max_workers: Number of concurrent user-detail fetches
+
+    Returns:
+        The same records, with name/email/profile_pic filled from user details
+    """
+    keys = list(dict.fromkeys(
+        (r["platform"], r["username"]) for r in records if r and r.get("username")
+    ))
+    if not keys:
+        return records
+
+    cutoff = (datetime.now() - timedelta(hours=ttl_hours)).isoformat()
+    users = get_user_details_many(keys, db_path, updated_since=cutoff)
+    missing = [key for key in keys if key not in users]
+    print(f"👤 Enriching {len(keys)} unique users ({len(users)} cached, {len(missing)} to fetch)")
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="enrich") as executor:
+            results = list(executor.map(_fetch_user, missing))
+        # Failed lookups are not saved, so the stored row stays as it was and is retried next run
+        fetched = {key: user for key, user in zip(missing, results) if user}
+        if len(fetched) < len(missing):
+            print(f"⚠️ No user details for {len(missing) - len(fetched)} user(s); will retry next run")
+        users.update(fetched)
+        # One transaction for all users; unchanged profiles don't grow the history table
+        save_user_details_many(list(fetched.values()), db_path, skip_unchanged=True)
+
+    for record in records:
+        if not record or not record.get("username"):
+            continue
+        user_data = users.get((record["platform"], record["username"]))
+        if user_data:
+            record.update({
+                "name": user_data.get("name") or record["name"],
+                "email": user_data.get("email") or record["email"],
+                "profile_pic": user_data.get("profile_pic") or record["profile_pic"]
+            })
+    return records
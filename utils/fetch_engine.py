@@ -0,0 +1,137 @@
+"""
+Concurrent fetch engine for the collectors.
+Drives every collector from a single asyncio event loop running in a
+background thread and yields each platform's results as soon as they arrive.
+Sync `fetch_*` functions run on the loop's thread pool; async collectors
+(Telegram, Discord) stream batches alongside them.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from collectors.base import AsyncCollector, as_collector
+
+# Defaults can be overridden from .env
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+FETCH_PER_PLATFORM_LIMIT = int(os.getenv("FETCH_PER_PLATFORM_LIMIT", "2"))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "90"))
+FETCH_QUEUE_SIZE = int(os.getenv("FETCH_QUEUE_SIZE", "16"))  # batches buffered ahead of the consumer
+
+_DONE = object()
+
+
+async def _put(out: queue.Queue, item, control: dict):
+    """Enqueue without blocking the event loop, waiting while the consumer is behind"""
+    while not control["closed"]:
+        try:
+            out.put_nowait(item)
+            return
+        except queue.Full:
+            await asyncio.sleep(0.05)
+
+
+async def _consume(collector: AsyncCollector, semaphore: asyncio.Semaphore, out: queue.Queue,
+                   control: dict, started: float):
+    """Push every batch a collector produces onto the output queue"""
+    total = 0
+    async with semaphore:
+        try:
+            async for batch in collector.stream():
+                if batch:
+                    total += len(batch)
+                    await _put(out, (collector.name, batch), control)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error fetching {collector.name}: {e}")
+            return
+    print(f"⏱️ {collector.name}: {total} records in {time.monotonic() - started:.1f}s")
+
+
+async def _drive(collectors, out: queue.Queue, control: dict,
+                 max_workers: int, per_platform_limit: int, deadline: float):
+    """Run all collectors on this loop until they finish or the deadline passes"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                 thread_name_prefix="collector"))
+    control["loop"] = loop
+    control["task"] = asyncio.current_task()
+    control["ready"].set()
+
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+    for c in collectors:
+        semaphores.setdefault(c.name, asyncio.Semaphore(max(1, per_platform_limit)))
+
+    started = time.monotonic()
+    tasks = {asyncio.create_task(_consume(c, semaphores[c.name], out, control, started)): c.name for c in collectors}
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            names = sorted({tasks[t] for t in pending})
+            print(f"⚠️ Fetch deadline of {deadline}s reached, skipping: {', '.join(names)}")
+    except asyncio.CancelledError:
+        pass  # consumer stopped reading
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await _put(out, _DONE, control)
+
+
+def fetch_all(collectors: Iterable,
+              max_workers: int = FETCH_MAX_WORKERS,
+              per_platform_limit: int = FETCH_PER_PLATFORM_LIMIT,
+              deadline: float = FETCH_DEADLINE,
+              max_pending: int = FETCH_QUEUE_SIZE,
+              heartbeat: Optional[float] = None) -> Iterator[Tuple[str, list]]:
+    """
+    Run collectors concurrently and yield results in arrival order
+
+    Args:
+        collectors: AsyncCollector instances or (platform_name, fetch_func, args) tuples
+        max_workers: Size of the thread pool used by sync collectors
+        per_platform_limit: Max concurrent collectors against the same platform
+        deadline: Overall time budget in seconds for the whole fetch
+        max_pending: Batches buffered before collectors wait for the consumer,
+            which keeps memory bounded when downstream stages are slower
+        heartbeat: If set, an empty ("", []) batch is yielded whenever no
+            results arrived for that many seconds, so time-based work
+            downstream (e.g. flushing a partial batch) still runs
+
+    Yields:
+        (platform_name, records) batches. Streaming collectors may yield
+        several batches; collectors that raise are reported and skipped.
+    """
+    collectors = [as_collector(c) for c in collectors]
+    if not collectors:
+        return
+
+    out: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+    control = {"ready": threading.Event(), "closed": False}
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(_drive(collectors, out, control, max_workers, per_platform_limit, deadline),),
+        name="fetch-engine",
+        daemon=True,
+    )
+    thread.start()
+
+    try:
+        while True:
+            try:
+                item = out.get(timeout=heartbeat)
+            except queue.Empty:
+                yield "", []
+                continue
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        # Consumer stopped early: cancel whatever is still running
+        control["closed"] = True
+        if thread.is_alive() and control["ready"].wait(timeout=1):
+            control["loop"].call_soon_threadsafe(control["task"].cancel)
@@ -0,0 +1,107 @@
+"""
+In-memory index over profile picture hashes.
+Hashes are packed into a HashMatrix so an uploaded image is scored against
+every profile (phash + dhash + whash) in a few vectorized operations.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.database import connect
+from utils.hash_scorer import HashMatrix
+
+def hash_to_int(value) -> Optional[int]:
+    """Accept a hex string (as stored in user_details.phash) or an imagehash.ImageHash"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value), 16)
+    except ValueError:
+        return None
+
+
+class ProfileHashIndex:
+    """
+    Profile picture hashes loaded from user_details once and then refreshed
+    incrementally from rows whose hashes changed since the last load, packed
+    into a HashMatrix for vectorized phash+dhash+whash scoring.
+    """
+
+    def __init__(self):
+        self.matrix = HashMatrix()
+        self.profiles: Dict[Tuple[str, str], dict] = {}
+        self.watermark = ""
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def add(self, platform, username, name, profile_pic, phash, dhash=None, whash=None):
+        """Insert or replace a profile's hashes; a profile without a phash is dropped"""
+        key = (platform, username)
+        hashes = {"phash": phash, "dhash": dhash, "whash": whash}
+        with self.lock:
+            current = self.profiles.pop(key, None)
+            if current is not None:
+                self.matrix.invalidate(current["row"])
+            if hash_to_int(phash) is None:
+                return  # e.g. the new picture failed to download
+            self.profiles[key] = {
+                "platform": platform,
+                "username": username,
+                "name": name,
+                "profile_pic": profile_pic,
+                "row": self.matrix.append(key, hashes),
+            }
+
+    def _load_rows(self, db_path, since=""):
+        conn = connect(db_path)
+        try:
+            return conn.execute("""
+                SELECT platform, username, name, profile_pic, phash, dhash, whash, phash_updated
+                FROM user_details
+                WHERE phash_updated > ?
+                ORDER BY phash_updated
+            """, (since,)).fetchall()
+        finally:
+            conn.close()
+
+    def load(self, db_path):
+        """Build the index from scratch"""
+        rows = self._load_rows(db_path)
+        with self.lock:
+            self.matrix = HashMatrix()
+            self.profiles = {}
+            self.watermark = ""
+            self._apply(rows)
+        print(f"🖼️ Loaded {len(self.profiles)} profile hashes into the image index")
+
+    def refresh(self, db_path):
+        """Pick up hashes written since the last load/refresh"""
+        rows = self._load_rows(db_path, self.watermark)
+        if rows:
+            with self.lock:
+                self._apply(rows)
+
+    def _apply(self, rows):
+        for platform, username, name, profile_pic, phash, dhash, whash, phash_updated in rows:
+            self.add(platform, username, name, profile_pic, phash, dhash, whash)
+            self.watermark = max(self.watermark, phash_updated or "")
+
+    def best_matches(self, hashes: Dict[str, object], n: int, max_distance: float) -> List[dict]:
+        """
+        Brute-force vectorized scoring of every profile against phash, dhash
+        and whash; `distance` is the weighted mean Hamming distance.
+        A phash BK-tree can't narrow this down much: with phash weighted 0.5,
+        a combined distance of 10 still allows a phash distance of 20, and a
+        search that wide visits most of the tree in Python.
+        """
+        with self.lock:
+            results = []
+            for score, key in self.matrix.top(hashes, n, max_score=max_distance):
+                profile = self.profiles[key]
+                match = {k: v for k, v in profile.items() if k != "row"}
+                match["distance"] = round(score, 1)
+                results.append(match)
+            return results
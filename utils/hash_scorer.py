@@ -0,0 +1,118 @@
+"""
+Vectorized Hamming-distance scoring for image matching.
+Stored hashes are packed into contiguous uint64 NumPy arrays (one per hash
+type) so a query is scored against every profile in a single popcount pass.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+HASH_TYPES = ("phash", "dhash", "whash")
+DEFAULT_WEIGHTS = {"phash": 0.5, "dhash": 0.25, "whash": 0.25}
+
+if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+    def popcount64(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values).astype(np.uint8)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount64(values: np.ndarray) -> np.ndarray:
+        bytes_view = values.view(np.uint8).reshape(-1, 8)
+        return _BYTE_POPCOUNT[bytes_view].sum(axis=1, dtype=np.uint8)
+
+
+def _to_uint64(value) -> Optional[int]:
+    """Hex string or imagehash.ImageHash -> int, None if missing"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(str(value), 16)
+    except ValueError:
+        return None
+
+
+class HashMatrix:
+    """
+    Append-only store of (phash, dhash, whash) per profile. Rows can be
+    invalidated when a profile's picture changes; capacity grows geometrically
+    so incremental inserts stay cheap.
+    """
+
+    def __init__(self, hash_types=HASH_TYPES, capacity: int = 1024):
+        self.hash_types = tuple(hash_types)
+        self.size = 0
+        self.keys: List[object] = []
+        self.hashes = {t: np.zeros(capacity, dtype=np.uint64) for t in self.hash_types}
+        self.present = {t: np.zeros(capacity, dtype=bool) for t in self.hash_types}
+        self.valid = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return int(self.valid[:self.size].sum())
+
+    def _grow(self):
+        capacity = max(1024, len(self.valid) * 2)
+        for t in self.hash_types:
+            self.hashes[t] = np.resize(self.hashes[t], capacity)
+            self.present[t] = np.resize(self.present[t], capacity)
+            self.present[t][self.size:] = False
+        self.valid = np.resize(self.valid, capacity)
+        self.valid[self.size:] = False
+
+    def append(self, key, hashes: Dict[str, object]) -> int:
+        """Add a row and return its index"""
+        if self.size == len(self.valid):
+            self._grow()
+        row = self.size
+        for t in self.hash_types:
+            value = _to_uint64(hashes.get(t))
+            self.hashes[t][row] = value or 0
+            self.present[t][row] = value is not None
+        self.valid[row] = True
+        self.keys.append(key)
+        self.size += 1
+        return row
+
+    def invalidate(self, row: int):
+        self.valid[row] = False
+
+    def distances(self, query: Dict[str, object]) -> Dict[str, np.ndarray]:
+        """Hamming distance from the query to every row, per hash type"""
+        result = {}
+        for t in self.hash_types:
+            value = _to_uint64(query.get(t))
+            if value is not None:
+                result[t] = popcount64(self.hashes[t][:self.size] ^ np.uint64(value))
+        return result
+
+    def score(self, query: Dict[str, object], weights: Dict[str, float] = None) -> np.ndarray:
+        """
+        Combined distance per row: weighted mean of the per-type Hamming
+        distances, using only hash types present on both sides. Rows with no
+        comparable hash (or invalidated rows) score +inf.
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        total = np.zeros(self.size, dtype=np.float32)
+        weight_sum = np.zeros(self.size, dtype=np.float32)
+        for t, dist in self.distances(query).items():
+            w = weights.get(t, 0.0)
+            if not w:
+                continue
+            mask = self.present[t][:self.size]
+            total += np.where(mask, dist * w, 0)
+            weight_sum += np.where(mask, w, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(weight_sum > 0, total / weight_sum, np.inf)
+        scores[~self.valid[:self.size]] = np.inf
+        return scores
+
+    def top(self, query: Dict[str, object], n: int, max_score: float = np.inf,
+            weights: Dict[str, float] = None):
+        """Up to n (score, key) pairs with score <= max_score, best first"""
+        if self.size == 0 or n <= 0:
+            return []
+        scores = self.score(query, weights)
+        candidates = np.flatnonzero(scores <= max_score)
+        if len(candidates) > n:
+            candidates = candidates[np.argpartition(scores[candidates], n - 1)[:n]]
+        candidates = candidates[np.argsort(scores[candidates], kind="stable")]
+        return [(float(scores[i]), self.keys[i]) for i in candidates]
@@ -0,0 +1,103 @@
+"""
+Shared HTTP client for collectors and user-detail fetchers.
+One pooled requests.Session keeps connections to each API host alive between
+calls instead of paying a new TCP/TLS handshake per request.
+"""
+import math
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from dotenv import load_dotenv
+
+from utils.rate_limiter import limiter
+
+load_dotenv()
+
+# Defaults can be overridden from .env
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "1"))
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # number of per-host pools kept
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))  # keep-alive connections per host
+USER_AGENT = os.getenv("HTTP_USER_AGENT", "OSINT_Pipeline/1.0")
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "3"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "120"))  # give up on longer Retry-After
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(retries: int = HTTP_RETRIES, backoff: float = HTTP_BACKOFF,
+                  pool_hosts: int = HTTP_POOL_HOSTS, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Create a session with per-host connection pools, retries and gzip"""
+    retry_strategy = Retry(
+        total=retries,
+        status_forcelist=[500, 502, 503, 504],  # 429 is handled by utils.rate_limiter
+        allowed_methods=["GET", "HEAD"],
+        backoff_factor=backoff,  # wait backoff * (1, 2, 4...) seconds between retries
+        raise_on_status=False  # hand the final response back so callers can inspect it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_size,
+        max_retries=retry_strategy
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": USER_AGENT
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def _rate_limited_response(url, retry_after: float) -> requests.Response:
+    """A local 429 for calls refused while the host's quota is exhausted"""
+    response = requests.Response()
+    response.status_code = 429
+    response.reason = "Too Many Requests"
+    response.url = url
+    response.headers["Retry-After"] = str(math.ceil(retry_after))
+    response._content = b""
+    return response
+
+
+def get(url, **kwargs) -> requests.Response:
+    """
+    requests.get replacement that goes through the shared session and the
+    per-host rate limiter. Rate-limited responses (429, or GitHub's 403 with
+    no remaining quota) are retried after the server's Retry-After/reset time;
+    if that is more than RATE_LIMIT_MAX_WAIT away, the rate-limited response is
+    returned instead, and later calls to the host get a 429 straight away
+    until the pause ends.
+    """
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    session = get_session()
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        if not limiter.acquire(url, max_wait=RATE_LIMIT_MAX_WAIT):
+            # Paused until a far-off reset (e.g. a monthly quota): fail now instead of sleeping
+            return _rate_limited_response(url, limiter.bucket(url).blocked_for())
+        response = session.get(url, **kwargs)
+        wait = limiter.update(url, response)
+        if wait is None:
+            return response
+        if attempt == RATE_LIMIT_RETRIES or wait > RATE_LIMIT_MAX_WAIT:
+            break
+        print(f"⏳ Rate limited by {urlparse(url).netloc}, retrying in {wait:.1f}s")
+    return response
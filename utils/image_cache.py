@@ -0,0 +1,222 @@
+"""
+On-disk cache for downloaded profile pictures.
+Images are stored under a hash of their URL together with their ETag /
+Last-Modified headers, so repeat lookups are served from disk and stale entries
+are revalidated with a conditional request instead of a full download. The
+cache is bounded in size and evicts least recently used entries.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+from PIL import Image
+
+from utils import http_client
+
+load_dotenv()
+
+IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", Path(__file__).resolve().parent.parent / "data" / "image_cache"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_MB", "256")) * 1024 * 1024
+IMAGE_CACHE_MAX_AGE = float(os.getenv("IMAGE_CACHE_MAX_AGE", "86400"))  # seconds before revalidating
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "8"))
+IMAGE_FETCH_WORKERS = int(os.getenv("IMAGE_FETCH_WORKERS", "8"))
+THUMBNAIL_SIZE = 96
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """Size-bounded LRU cache of image bytes keyed by URL"""
+
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+                 max_age: float = IMAGE_CACHE_MAX_AGE):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.entries: "OrderedDict[str, int]" = OrderedDict()  # digest -> size, oldest first
+        self.total = 0
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def _paths(self, digest: str):
+        folder = self.directory / digest[:2]
+        return folder / digest, folder / f"{digest}.json"
+
+    def _load_index(self):
+        """Scan the cache directory once, ordering entries by last access (mtime)"""
+        if self.loaded:
+            return
+        found = []
+        if self.directory.exists():
+            for meta_path in self.directory.glob("*/*.json"):
+                data_path = meta_path.with_suffix("")
+                try:
+                    stat = data_path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, data_path.name, stat.st_size))
+        for _, digest, size in sorted(found):
+            self.entries[digest] = size
+            self.total += size
+        self.loaded = True
+
+    def _read(self, digest: str):
+        data_path, meta_path = self._paths(digest)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            data = data_path.read_bytes()
+        except (OSError, ValueError):
+            self._remove(digest)
+            return None, None
+        return data, meta
+
+    def _remove(self, digest: str):
+        size = self.entries.pop(digest, None)
+        if size is not None:
+            self.total -= size
+        for path in self._paths(digest):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _adopt(self, digest: str) -> bool:
+        """Index an entry another process wrote to the shared directory since the scan"""
+        data_path, meta_path = self._paths(digest)
+        try:
+            size = data_path.stat().st_size
+        except OSError:
+            return False
+        if not meta_path.exists():
+            return False
+        self.entries[digest] = size
+        self.total += size
+        return True
+
+    def _evict(self):
+        while self.total > self.max_bytes and self.entries:
+            self._remove(next(iter(self.entries)))
+
+    def get(self, key: str):
+        """Cached (bytes, metadata) for key, or (None, None). Marks the entry as recently used."""
+        digest = _digest(key)
+        with self.lock:
+            self._load_index()
+            if digest not in self.entries and not self._adopt(digest):
+                return None, None
+            data, meta = self._read(digest)
+            if data is not None:
+                self.entries.move_to_end(digest)
+                try:
+                    os.utime(self._paths(digest)[0])  # persist LRU order across restarts
+                except OSError:
+                    pass
+            return data, meta
+
+    def put(self, key: str, data: bytes, meta: dict = None):
+        """Store bytes (written atomically) and evict old entries past the size limit"""
+        digest = _digest(key)
+        data_path, meta_path = self._paths(digest)
+        meta = dict(meta or {}, key=key, size=len(data), stored=time.time())
+        with self.lock:
+            self._load_index()
+            if len(data) > self.max_bytes:
+                return
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            for path, content in ((data_path, data), (meta_path, json.dumps(meta).encode("utf-8"))):
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_bytes(content)
+                os.replace(tmp, path)
+            self.total += len(data) - self.entries.pop(digest, 0)
+            self.entries[digest] = len(data)
+            self._evict()
+
+    def touch(self, key: str, meta: dict):
+        """Record a successful revalidation (304) for an entry"""
+        digest = _digest(key)
+        meta_path = self._paths(digest)[1]
+        with self.lock:
+            if digest in self.entries:
+                meta_path.write_text(json.dumps(dict(meta, stored=time.time())), encoding="utf-8")
+
+    def fetch(self, url: str, timeout: float = IMAGE_FETCH_TIMEOUT) -> Optional[bytes]:
+        """
+        Image bytes for url, downloading only if missing or stale
+
+        Fresh entries are returned without a request; stale ones are revalidated
+        with If-None-Match / If-Modified-Since. If the download fails the stale
+        copy is returned.
+
+        Returns:
+            bytes, or None if the image is unavailable
+        """
+        if not url:
+            return None
+        data, meta = self.get(url)
+        if data is not None and time.time() - meta.get("stored", 0) < self.max_age:
+            return data
+
+        headers = {}
+        if data is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            # Image CDNs are not the APIs the rate limiter budgets for, so use the
+            # pooled session directly instead of spending API tokens
+            resp = http_client.get_session().get(url, headers=headers, timeout=timeout)
+            if resp.status_code == 304 and data is not None:
+                self.touch(url, meta)
+                return data
+            resp.raise_for_status()
+        except Exception:
+            return data
+
+        self.put(url, resp.content, {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_type": resp.headers.get("Content-Type"),
+        })
+        return resp.content
+
+    def fetch_many(self, urls: Iterable[str], max_workers: int = IMAGE_FETCH_WORKERS) -> Dict[str, Optional[bytes]]:
+        """Fetch many URLs on a bounded worker pool; returns url -> bytes or None"""
+        urls = [url for url in dict.fromkeys(urls) if url]
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="imgfetch") as executor:
+            return dict(zip(urls, executor.map(self.fetch, urls)))
+
+    def thumbnail(self, url: str, size: int = THUMBNAIL_SIZE) -> Optional[bytes]:
+        """JPEG thumbnail of the image at url, generated from the cached original and cached itself"""
+        original = self.fetch(url)
+        if original is None:
+            return None
+        key = f"{url}#thumb{size}"
+        source = hashlib.sha1(original).hexdigest()
+        data, meta = self.get(key)
+        if data is not None and meta.get("source") == source:
+            return data
+        try:
+            img = Image.open(io.BytesIO(original)).convert("RGB")
+            img.thumbnail((size, size))
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=85)
+        except Exception:
+            return None
+        self.put(key, out.getvalue(), {"content_type": "image/jpeg", "source": source})
+        return out.getvalue()
+
+
+image_cache = ImageCache()
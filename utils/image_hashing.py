@@ -0,0 +1,52 @@
+"""
+Perceptual hashing (phash, dhash, whash) of profile pictures.
+Hashes are computed once at enrichment time and stored in user_details so
+/search_by_image only compares hashes and never downloads images. Image bytes
+come from utils.image_cache, so re-hashing a known avatar reads it from disk.
+"""
+import io
+from typing import Dict, Iterable, Optional
+
+import imagehash
+from PIL import Image
+
+from utils.image_cache import IMAGE_FETCH_TIMEOUT, IMAGE_FETCH_WORKERS, image_cache
+
+
+HASH_FUNCTIONS = {
+    "phash": imagehash.phash,
+    "dhash": imagehash.dhash,
+    "whash": imagehash.whash,
+}
+
+
+def compute_image_hashes(img) -> Dict[str, str]:
+    """phash, dhash and whash of a PIL image as 16-char hex strings"""
+    img = img.convert('RGB')
+    return {name: str(func(img)) for name, func in HASH_FUNCTIONS.items()}
+
+
+def _hash_bytes(data: Optional[bytes]) -> Optional[Dict[str, str]]:
+    if data is None:
+        return None
+    try:
+        return compute_image_hashes(Image.open(io.BytesIO(data)))
+    except Exception:
+        return None
+
+
+def fetch_image_hashes_from_url(url, timeout=IMAGE_FETCH_TIMEOUT) -> Optional[Dict[str, str]]:
+    """Load an image through the on-disk cache and compute its perceptual hashes. Returns None on failure."""
+    return _hash_bytes(image_cache.fetch(url, timeout=timeout))
+
+
+def hash_image_urls(urls: Iterable[str], max_workers: int = IMAGE_FETCH_WORKERS) -> Dict[str, Optional[Dict[str, str]]]:
+    """
+    Compute hashes for many image URLs, downloading uncached ones concurrently
+
+    Returns:
+        dict mapping each URL to {"phash", "dhash", "whash"} hex strings, or
+        None if the image could not be downloaded or decoded
+    """
+    images = image_cache.fetch_many(urls, max_workers=max_workers)
+    return {url: _hash_bytes(data) for url, data in images.items()}
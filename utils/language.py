@@ -0,0 +1,117 @@
+"""
+Language identification for filter_english and the NLP stage.
+langdetect costs several milliseconds per text, so before calling it texts go
+through a fast path (no letters -> undetermined, ASCII text with clear English
+function words -> English) and an LRU cache keyed by a hash of the text.
+Batches are de-duplicated first, so repeated captions are only detected once.
+"""
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from langdetect import DetectorFactory, detector_factory
+from langdetect.detector_factory import init_factory
+from langdetect.lang_detect_exception import LangDetectException
+
+# Set seed for consistent results
+DetectorFactory.seed = 0
+
+LANG_CACHE_SIZE = int(os.getenv("LANG_CACHE_SIZE", "50000"))
+
+# Words that are common in English text and rare elsewhere; ambiguous ones
+# like "a", "in", "is", "no", "me" are left out on purpose
+ENGLISH_MARKERS = frozenset("""
+    the and of to that this with for you your are have has had were been they their there
+    what which who would will about from just like not but its our them then than when
+    where why how could should does dont didnt cant wont im ive youre thats these those
+    into over after before because while being very much some any only also
+""".split())
+MARKER_MIN_HITS = 2
+MARKER_MIN_RATIO = 0.25
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+Detection = Tuple[Optional[str], float]  # (language code or None, confidence 0-1)
+
+
+def _fast_path(text: str) -> Optional[Detection]:
+    """Answer without langdetect when the text makes it obvious, else None"""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return (None, 0.0)  # numbers, URLs, emoji: nothing to detect
+    if not text.isascii():
+        return None
+    hits = sum(1 for w in words if w in ENGLISH_MARKERS)
+    ratio = hits / len(words)
+    if hits >= MARKER_MIN_HITS and ratio >= MARKER_MIN_RATIO:
+        return ("en", min(0.99, 0.5 + ratio))
+    return None
+
+
+def _detect(text: str) -> Detection:
+    """Full langdetect run; most probable language and its probability"""
+    if detector_factory._factory is None:
+        init_factory()  # load the language profiles once per process
+    try:
+        detector = detector_factory._factory.create()
+        detector.append(text)
+        best = detector.get_probabilities()[0]
+        return (best.lang, round(best.prob, 4))
+    except (LangDetectException, IndexError):
+        return (None, 0.0)
+
+
+class LanguageIdentifier:
+    """Language detection with a fast path, an LRU cache and a batch API"""
+
+    def __init__(self, cache_size: int = LANG_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[bytes, Detection]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(" ".join(text.lower().split()).encode("utf-8"), digest_size=16).digest()
+
+    def detect(self, text: str) -> Detection:
+        """(language, confidence) for one text"""
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts: Iterable[str]) -> List[Detection]:
+        """(language, confidence) for every text, in order; (None, 0.0) if undetermined"""
+        texts = list(texts)
+        results: List[Optional[Detection]] = [None] * len(texts)
+        pending = {}  # cache key -> indexes of texts still needing langdetect
+        for i, text in enumerate(texts):
+            if not text:
+                results[i] = (None, 0.0)
+                continue
+            quick = _fast_path(text)
+            if quick is not None:
+                results[i] = quick
+                continue
+            key = self._key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        for key, indexes in pending.items():
+            self.misses += 1
+            detection = _detect(texts[indexes[0]])
+            self.cache[key] = detection
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            for i in indexes:
+                results[i] = detection
+        return results
+
+
+# Shared per process (each NLP worker process gets its own)
+identifier = LanguageIdentifier()
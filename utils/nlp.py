@@ -0,0 +1,129 @@
+"""
+Multiprocess NLP stage: language detection and sentiment.
+langdetect and TextBlob are pure Python and hold the GIL, so records are split
+into chunks and analyzed on a process pool. Each worker loads the language
+profiles and fixes the detector seed once at start-up, and results come back
+in input order. Language detection goes through utils.language (fast path,
+per-process LRU cache, batched calls); with a SentimentCache, cached scores are
+looked up in the main process first and only new texts are scored by workers.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from utils.cleaners import record_text
+from utils.sentiment_cache import Scores
+
+load_dotenv()
+
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", "0")) or (os.cpu_count() or 1)
+NLP_CHUNK_SIZE = int(os.getenv("NLP_CHUNK_SIZE", "64"))
+
+# The pool starts while fetch and enrichment threads are running; forking then
+# could copy locks they hold into the workers, so workers never fork from here
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_worker_ready = False
+
+
+def _init_worker():
+    """Load langdetect profiles and the sentiment backend once per process"""
+    global _worker_ready
+    if _worker_ready:
+        return
+    from langdetect.detector_factory import init_factory
+    init_factory()  # detector seed is fixed in utils.language
+    from utils.sentiment import score_texts
+    score_texts(["warm up"])  # loads the sentiment lexicon
+    _worker_ready = True
+
+
+def _analyze_chunk(items: List[Tuple[str, bool]]) -> List[Tuple[Optional[str], Optional[Scores]]]:
+    """
+    (language, sentiment scores) per (text, score it) item; scores are only
+    computed for English texts that asked for them, language is None if
+    detection failed
+    """
+    from utils.language import identifier
+    from utils.sentiment import score_texts
+
+    _init_worker()
+    langs = [lang for lang, _ in identifier.detect_batch(text for text, _ in items)]
+    # The backend scores the chunk's English texts in one call
+    wanted = [i for i, ((_, score), lang) in enumerate(zip(items, langs)) if score and lang == "en"]
+    scores = dict(zip(wanted, score_texts(items[i][0] for i in wanted)))
+    return [(lang, scores.get(i)) for i, lang in enumerate(langs)]
+
+
+class NLPStage:
+    """
+    Pipeline stage doing filter_english + add_sentiment in one pass, with
+    chunks fanned out to a process pool. With one worker everything runs in
+    the calling process. Use as a context manager so the pool is shut down.
+    """
+
+    def __init__(self, workers: int = NLP_WORKERS, chunk_size: int = NLP_CHUNK_SIZE, cache=None):
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.cache = cache
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def analyze(self, texts: List[str]) -> List[Tuple[Optional[str], Optional[Scores]]]:
+        """(language, sentiment scores) for each text, in input order; scores only for English"""
+        cached = self.cache.get_many(texts) if self.cache else {}
+        # Each uncached text is scored once, even if it repeats in the batch
+        pending = set()
+        items = []
+        for text in texts:
+            score = text not in cached and text not in pending
+            pending.add(text)
+            items.append((text, score))
+
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        if self.workers == 1 or len(chunks) == 1:
+            results = [_analyze_chunk(chunk) for chunk in chunks]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                    mp_context=multiprocessing.get_context(_START_METHOD))
+            results = self.executor.map(_analyze_chunk, chunks)
+        results = [item for chunk in results for item in chunk]
+
+        fresh = {text: scores for text, (_, scores) in zip(texts, results) if scores is not None}
+        if self.cache:
+            self.cache.put_many(fresh)
+        known = {**cached, **fresh}
+        return [(lang, known.get(text) if lang == "en" else None) for text, (lang, _) in zip(texts, results)]
+
+    def __call__(self, records):
+        """Filter a batch to English records and add their sentiment fields"""
+        from utils.sentiment import set_sentiment
+
+        records = [r for r in records or [] if record_text(r) is not None]
+        if not records:
+            return []
+        kept = []
+        failed = 0
+        for record, (lang, scores) in zip(records, self.analyze([record_text(r) for r in records])):
+            if lang is None:
+                failed += 1
+            elif lang == "en":
+                set_sentiment(record, scores)
+                kept.append(record)
+        if failed:
+            print(f"⚠️ Language detection found no language in {failed} record(s)")
+        return kept
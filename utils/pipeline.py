@@ -0,0 +1,50 @@
+"""
+Streaming building blocks for run_pipeline.
+Records move through the stages (normalize -> enrich -> clean -> language
+filter -> sentiment -> write) as small batches pulled through generators, so
+only a few batches are in memory at any time and each one is committed as soon
+as it has been processed.
+"""
+import os
+import time
+from typing import Callable, Iterable, Iterator, List
+
+PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "200"))
+PIPELINE_FLUSH_INTERVAL = float(os.getenv("PIPELINE_FLUSH_INTERVAL", "2"))  # seconds
+
+
+def rebatch(batches: Iterable[list], size: int = PIPELINE_BATCH_SIZE,
+            flush_interval: float = PIPELINE_FLUSH_INTERVAL) -> Iterator[list]:
+    """
+    Regroup incoming batches into batches of at most `size` records
+
+    Small batches are merged, but whatever has accumulated is passed on once
+    `flush_interval` seconds have gone by, so slow sources still reach the
+    database quickly. The interval is checked whenever a batch arrives, so a
+    source that can go quiet should send empty batches as a heartbeat.
+    """
+    pending: list = []
+    last_flush = time.monotonic()
+    for batch in batches:
+        pending.extend(batch)
+        while len(pending) >= size:
+            yield pending[:size]
+            pending = pending[size:]
+            last_flush = time.monotonic()
+        if pending and time.monotonic() - last_flush >= flush_interval:
+            yield pending
+            pending = []
+            last_flush = time.monotonic()
+    if pending:
+        yield pending
+
+
+def run_stages(batches: Iterable[list], stages: List[Callable[[list], list]]) -> Iterator[list]:
+    """Pass each batch through every stage in order, dropping batches that end up empty"""
+    for batch in batches:
+        for stage in stages:
+            batch = stage(batch)
+            if not batch:
+                break
+        else:
+            yield batch
@@ -0,0 +1,184 @@
+"""
+Per-host rate limiting for outgoing API calls.
+Each host gets a token bucket; quota headers (X-RateLimit-Remaining /
+X-RateLimit-Reset, RapidAPI's X-RateLimit-Requests-*) and Retry-After are fed
+back into the bucket so requests are spread over the remaining window instead
+of failing with 429 and dropping a platform's data.
+"""
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Requests per second per host, overridable with RATE_LIMITS="host=rps,host=rps"
+RATE_LIMIT_DEFAULT_RPS = float(os.getenv("RATE_LIMIT_DEFAULT_RPS", "5"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "5"))
+DEFAULT_HOST_RATES = {
+    "api.github.com": 1.0,
+    "www.reddit.com": 1.0,
+}
+
+
+def _parse_host_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in (value or "").split(","):
+        host, _, rps = item.partition("=")
+        if host.strip() and rps.strip():
+            try:
+                rates[host.strip()] = float(rps)
+            except ValueError:
+                print(f"⚠️ Ignoring invalid RATE_LIMITS entry: {item}")
+    return rates
+
+
+HOST_RATES = {**DEFAULT_HOST_RATES, **_parse_host_rates(os.getenv("RATE_LIMITS", ""))}
+
+
+def _header(headers, *names) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _seconds_until(value: Optional[str], now: float) -> Optional[float]:
+    """Interpret a reset/Retry-After header as seconds from now"""
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        # Retry-After may be an HTTP date
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            return None
+    # Large values are epoch timestamps (GitHub), small ones are deltas (RapidAPI)
+    if number > 1_000_000_000:
+        return max(0.0, number - now)
+    return max(0.0, number)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that can also be paused until a reset time"""
+
+    def __init__(self, rate: float, capacity: float = RATE_LIMIT_BURST):
+        self.rate = max(rate, 0.01)
+        self.max_rate = self.rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Block until a request may be sent
+
+        Returns False straight away, without taking a token, if the host is
+        paused for longer than `max_wait` seconds.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                    if max_wait is not None and wait > max_wait:
+                        return False
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def blocked_for(self) -> float:
+        """Seconds left until the host's pause ends"""
+        with self.lock:
+            return max(0.0, self.blocked_until - time.monotonic())
+
+    def pause(self, seconds: float):
+        """Hold all requests to this host for `seconds`"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def apply_quota(self, remaining: int, reset_in: Optional[float]):
+        """Spread the remaining quota evenly over the time left in the window"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+            if reset_in:
+                self.rate = min(self.max_rate, max(remaining / reset_in, 0.01))
+            else:
+                self.rate = self.max_rate
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by host"""
+
+    def __init__(self, default_rps: float = RATE_LIMIT_DEFAULT_RPS, host_rates: Dict[str, float] = None):
+        self.default_rps = default_rps
+        self.host_rates = host_rates if host_rates is not None else HOST_RATES
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.host_rates.get(host, self.default_rps))
+            return self.buckets[host]
+
+    def acquire(self, url: str, max_wait: Optional[float] = None) -> bool:
+        return self.bucket(url).acquire(max_wait)
+
+    def update(self, url: str, response) -> Optional[float]:
+        """
+        Feed a response's quota headers back into the host's bucket
+
+        Returns:
+            Seconds to wait before retrying if the response was rate limited,
+            otherwise None
+        """
+        bucket = self.bucket(url)
+        headers = response.headers
+        now = time.time()
+
+        remaining = _header(headers, "X-RateLimit-Remaining", "X-RateLimit-Requests-Remaining")
+        reset_in = _seconds_until(_header(headers, "X-RateLimit-Reset", "X-RateLimit-Requests-Reset"), now)
+        retry_after = _seconds_until(_header(headers, "Retry-After"), now)
+
+        if remaining is not None:
+            try:
+                remaining = int(float(remaining))
+            except ValueError:
+                remaining = None
+
+        limited = response.status_code == 429 or (response.status_code == 403 and remaining == 0)
+        if not limited:
+            if remaining is not None:
+                if remaining <= 0 and reset_in:
+                    bucket.pause(reset_in)
+                else:
+                    bucket.apply_quota(remaining, reset_in)
+            return None
+
+        # Prefer the server's hint; fall back to the window reset, then a short backoff
+        wait = retry_after if retry_after is not None else reset_in
+        if wait is None:
+            wait = max(1.0, 1.0 / bucket.rate)
+        bucket.pause(wait)
+        return wait
+
+
+limiter = RateLimiter()
+
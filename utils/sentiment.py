@@ -1,37 +1,130 @@
-from textblob import TextBlob
+from importlib import metadata
+from dotenv import load_dotenv
 import os
-import matplotlib.pyplot as plt
+import time
 
-def add_sentiment(data):
+load_dotenv()
+
+# Which scorer add_sentiment and the NLP stage use (see BACKENDS)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "textblob")
+
+class TextBlobBackend:
+    """Reference scorer: TextBlob's pattern analyzer, one text at a time"""
+
+    name = "textblob"
+
+    def __init__(self):
+        from textblob import TextBlob  # textblob/nltk are only imported when this backend is used
+        self._blob = TextBlob
+        # Cached scores are only reused for the same model
+        self.model = f"textblob-pattern-{metadata.version('textblob')}"
+
+    def score_batch(self, texts):
+        """(polarity, subjectivity) for every text, in order"""
+        return [tuple(self._blob(text).sentiment) if text else (0.0, 0.0) for text in texts]
+
+def _lexicon_backend():
+    from utils.sentiment_lexicon import LexiconBackend  # needs numpy
+    return LexiconBackend()
+
+# name -> factory of an object with .model and .score_batch(texts)
+BACKENDS = {
+    "textblob": TextBlobBackend,
+    "lexicon": _lexicon_backend,
+}
+
+_backends = {}
+
+def get_backend(name=None):
+    """The scorer for a backend name (SENTIMENT_BACKEND by default), created once per process"""
+    name = name or SENTIMENT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {name!r}; choose from {', '.join(BACKENDS)}")
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+def sentiment_label(polarity):
+    """Map a polarity (-1.0 to 1.0) to 'Positive', 'Negative' or 'Neutral'"""
+    if polarity > 0.1:
+        return "Positive"
+    if polarity < -0.1:
+        return "Negative"
+    return "Neutral"
+
+def score_texts(texts, backend=None):
+    """(polarity, subjectivity) for every text with the configured backend"""
+    return get_backend(backend).score_batch(list(texts))
+
+def set_sentiment(record, scores):
+    """Store (polarity, subjectivity) and the matching label on a record"""
+    polarity, subjectivity = scores
+    record["polarity"] = polarity
+    record["subjectivity"] = subjectivity
+    record["sentiment_label"] = sentiment_label(polarity)
+
+def add_sentiment(data, cache=None):
     """
-    Adds a sentiment field to each record in the data list.
-    Sentiment can be 'Positive', 'Negative', or 'Neutral'.
+    Adds polarity (-1.0 to 1.0), subjectivity (0.0 to 1.0) and sentiment_label
+    ('Positive', 'Negative' or 'Neutral') to each record in the data list.
+    With a SentimentCache, texts scored before are not scored again.
     """
     if not data:
         return []
 
-    for record in data:
-        text = record.get("text", "")
-        if text:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity  # -1.0 to 1.0
-            if polarity > 0.1:
-                sentiment = "Positive"
-            elif polarity < -0.1:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
-        else:
-            sentiment = "Neutral"
-        
-        record["sentiment"] = sentiment
+    texts = [record.get("text") or "" for record in data]
+    scores = cache.get_many(texts) if cache else {}
+    unseen = list(dict.fromkeys(text for text in texts if text and text not in scores))
+    fresh = dict(zip(unseen, score_texts(unseen)))
+    if cache:
+        cache.put_many(fresh)
+    scores.update(fresh)
+
+    for record, text in zip(data, texts):
+        set_sentiment(record, scores[text] if text else (0.0, 0.0))
 
     return data
 
+def compare_backends(texts, reference="textblob", backends=None):
+    """
+    Parity and throughput of each backend against the reference one
+
+    Args:
+        texts: Cleaned texts to score
+        reference: Backend whose scores count as correct
+        backends: Backend names to compare (all registered ones by default)
+
+    Returns:
+        list of dicts: backend, texts/s, share of matching labels and of
+        identical scores, mean absolute polarity difference
+    """
+    texts = [t for t in texts if t]
+    if not texts:
+        return []
+    expected = None
+    rows = []
+    for name in [reference] + [b for b in backends or BACKENDS if b != reference]:
+        backend = get_backend(name)  # set-up (lexicon loading) is not timed
+        start = time.perf_counter()
+        scores = backend.score_batch(texts)
+        elapsed = time.perf_counter() - start
+        expected = expected or scores
+        pairs = list(zip(scores, expected))
+        rows.append({
+            "backend": name,
+            "texts": len(texts),
+            "texts_per_sec": round(len(texts) / elapsed) if elapsed else None,
+            "label_agreement": sum(sentiment_label(a[0]) == sentiment_label(b[0]) for a, b in pairs) / len(pairs),
+            "exact": sum(abs(a[0] - b[0]) < 1e-9 and abs(a[1] - b[1]) < 1e-9 for a, b in pairs) / len(pairs),
+            "mean_polarity_diff": sum(abs(a[0] - b[0]) for a, b in pairs) / len(pairs),
+        })
+    return rows
+
 def save_sentiment_chart(data, output_dir="screenshots", filename="sentiment_chart.png"):
     """
     Creates a pie chart or bar chart of sentiment distribution and saves it as an image.
     """
+    import matplotlib.pyplot as plt  # optional export only; keep the plotting stack out of imports
     if not data:
         print("⚠️ No data to visualize.")
         return
@@ -39,7 +132,7 @@ def save_sentiment_chart(data, output_dir="screenshots", filename="sentiment_cha
     # Count sentiment types
     counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
     for record in data:
-        s = record.get("sentiment", "Neutral")
+        s = record.get("sentiment_label", "Neutral")
         if s in counts:
             counts[s] += 1
 
@@ -0,0 +1,89 @@
+"""
+Persistent sentiment cache.
+Scores live in the sentiment_cache table keyed by the model version and a hash
+of the cleaned text. A batch is looked up in one query per 400 texts before
+scoring, so only texts never seen by the current model reach the analyzer;
+bumping the model version simply starts a new set of rows.
+"""
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Tuple
+
+from utils.database import connect, ensure_schema
+
+Scores = Tuple[float, float]  # (polarity, subjectivity)
+
+LOOKUP_CHUNK = 400  # stays under SQLite's bound-parameter limit
+
+
+def text_key(text: str) -> bytes:
+    """Cache key of a cleaned text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class SentimentCache:
+    """
+    Bulk get/put of sentiment scores for one model version
+
+    `hits` counts texts answered from the table, `misses` texts that had to be
+    scored and were written back.
+    """
+
+    def __init__(self, db_path, model: str):
+        self.db_path = db_path
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        ensure_schema(db_path)
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, Scores]:
+        """Cached scores for whichever of the texts have them"""
+        keys = {}
+        for text in texts:
+            if text:
+                keys.setdefault(text_key(text), text)
+        if not keys:
+            return {}
+
+        found = {}
+        hashes = list(keys)
+        conn = connect(self.db_path)
+        try:
+            for i in range(0, len(hashes), LOOKUP_CHUNK):
+                chunk = hashes[i:i + LOOKUP_CHUNK]
+                rows = conn.execute(f"""
+                    SELECT text_hash, polarity, subjectivity
+                    FROM sentiment_cache
+                    WHERE model = ? AND text_hash IN ({", ".join("?" for _ in chunk)})
+                """, [self.model, *chunk])
+                for text_hash, polarity, subjectivity in rows:
+                    found[keys[text_hash]] = (polarity, subjectivity)
+        except sqlite3.Error as e:
+            print(f"⚠️ Sentiment cache lookup failed: {e}")
+        finally:
+            conn.close()
+        self.hits += len(found)
+        return found
+
+    def put_many(self, scores: Dict[str, Scores]):
+        """Store freshly computed scores"""
+        if not scores:
+            return
+        self.misses += len(scores)
+        rows = [(self.model, text_key(text), p, s) for text, (p, s) in scores.items()]
+        conn = connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO sentiment_cache (model, text_hash, polarity, subjectivity)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+        except sqlite3.Error as e:
+            print(f"⚠️ Sentiment cache write failed: {e}")
+        finally:
+            conn.close()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{self.hits} cached, {self.misses} scored ({rate:.0%} hit rate)"
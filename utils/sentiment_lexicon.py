@@ -0,0 +1,173 @@
+"""
+Vectorized lexicon sentiment backend.
+Reads the same en-sentiment.xml lexicon TextBlob's pattern analyzer uses
+(without importing textblob or nltk) into NumPy arrays indexed by token id.
+A batch is tokenized once into one flat id array; polarity, subjectivity and
+the modifier ("very good") and negation ("not good") rules are then applied
+with array lookups and shifts, and averaged per text with bincount.
+Punctuation rules (exclamation marks, emoticons) are left out because texts
+arrive normalized without punctuation.
+"""
+import hashlib
+import importlib.util
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import numpy as np
+
+# Bump when the scoring rules change so cached scores are not reused
+LEXICON_RULES_VERSION = 1
+
+NEGATIONS = ("no", "not", "n't", "never")
+MODIFIER_POS = "RB"
+
+
+def default_lexicon_path() -> Optional[str]:
+    """SENTIMENT_LEXICON from the environment, else the file shipped with textblob"""
+    path = os.getenv("SENTIMENT_LEXICON")
+    if path:
+        return path
+    spec = importlib.util.find_spec("textblob")  # locates the package without importing it
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(list(spec.submodule_search_locations)[0], "en", "en-sentiment.xml")
+
+
+def _avg(values):
+    return sum(values) / len(values)
+
+
+def load_lexicon(path: str) -> dict:
+    """
+    word -> (polarity, subjectivity, intensity, is_modifier), averaged over
+    word senses and part-of-speech tags the way pattern does, plus the -ly
+    adverbs pattern derives from adjectives
+    """
+    senses = {}
+    for w in ElementTree.parse(path).getroot().findall("word"):
+        form = w.attrib.get("form")
+        if form:
+            psi = (float(w.attrib.get("polarity", 0.0)),
+                   float(w.attrib.get("subjectivity", 0.0)),
+                   float(w.attrib.get("intensity", 1.0)))
+            senses.setdefault(form, {}).setdefault(w.attrib.get("pos"), []).append(psi)
+
+    words = {}
+    for form, by_pos in senses.items():
+        by_pos = {pos: [_avg(each) for each in zip(*psi)] for pos, psi in by_pos.items()}
+        by_pos[None] = [_avg(each) for each in zip(*by_pos.values())]
+        words[form] = by_pos
+    # "terrible" -> "terribly" with the adjective's scores
+    for form, by_pos in list(words.items()):
+        if "JJ" in by_pos:
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            adverb = words.setdefault(form + "ly", {})
+            adverb[MODIFIER_POS] = adverb[None] = by_pos["JJ"]
+
+    return {form: (*by_pos[None], MODIFIER_POS in by_pos) for form, by_pos in words.items()}
+
+
+def _previous(flags: np.ndarray) -> np.ndarray:
+    """For each position, the index of the last earlier position where flags is set (-1 if none)"""
+    positions = np.where(flags, np.arange(len(flags)), -1)
+    last = np.maximum.accumulate(positions) if len(flags) else positions
+    previous = np.empty_like(last)
+    previous[:1] = -1
+    previous[1:] = last[:-1]
+    return previous
+
+
+class LexiconBackend:
+    """Batch sentiment scorer over the pattern lexicon, approximating TextBlob's scores"""
+
+    name = "lexicon"
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or default_lexicon_path()
+        if not path or not Path(path).exists():
+            raise FileNotFoundError("Sentiment lexicon not found; install textblob or set SENTIMENT_LEXICON")
+        digest = hashlib.blake2b(Path(path).read_bytes(), digest_size=6).hexdigest()
+        self.model = f"lexicon-{LEXICON_RULES_VERSION}-{digest}"
+
+        lexicon = load_lexicon(path)
+        vocabulary = list(lexicon) + [w for w in NEGATIONS if w not in lexicon]
+        # Id 0 is the unknown token
+        self.ids = {word: i for i, word in enumerate(vocabulary, start=1)}
+        size = len(vocabulary) + 1
+        self.polarity = np.zeros(size)
+        self.subjectivity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        self.adverb_ly = np.array([False] + [w.endswith("ly") for w in vocabulary])
+        for word, (p, s, i, is_modifier) in lexicon.items():
+            k = self.ids[word]
+            self.polarity[k], self.subjectivity[k], self.intensity[k] = p, s, i
+            self.known[k] = True
+            self.modifier[k] = is_modifier
+        for word in NEGATIONS:
+            self.negation[self.ids[word]] = True
+
+    def score_batch(self, texts: Iterable[str]) -> List[Tuple[float, float]]:
+        """(polarity, subjectivity) for every text, in order"""
+        texts = list(texts)
+        tokens, counts = [], []
+        for text in texts:
+            words = text.lower().split() if text else []
+            tokens.extend(words)
+            counts.append(len(words))
+        if not tokens:
+            return [(0.0, 0.0)] * len(texts)
+
+        get = self.ids.get
+        ids = np.fromiter((get(t, 0) for t in tokens), dtype=np.int64, count=len(tokens))
+        lengths = np.fromiter((len(t.strip("'")) for t in tokens), dtype=np.int64, count=len(tokens))
+        doc = np.repeat(np.arange(len(texts)), counts)
+        known = self.known[ids]
+
+        # A modifier carries over unknown words of up to 2 letters ("very a good"),
+        # a negation over unknown 1-letter words ("not a good"); known words end both
+        prev_m = _previous(known | (lengths > 2))
+        prev_n = _previous(known | (lengths > 1))
+        safe_m = np.maximum(prev_m, 0)
+        safe_n = np.maximum(prev_n, 0)
+        after_modifier = (prev_m >= 0) & (doc[safe_m] == doc) & known[safe_m] & self.modifier[ids[safe_m]]
+        negated = known & (prev_n >= 0) & (doc[safe_n] == doc) & self.negation[ids[safe_n]]
+
+        # "really not good": a negation right after an -ly adverb negates the
+        # adverb's assessment, and the adverb still modifies the next word
+        bridge = self.negation[ids] & ~known & after_modifier & self.adverb_ly[ids[safe_m]]
+        negated_tail = np.zeros(len(ids), dtype=bool)
+        negated_tail[prev_m[bridge]] = True
+        via_bridge = (prev_m >= 0) & bridge[safe_m] & (doc[safe_m] == doc)
+        prev_m = np.where(via_bridge, prev_m[safe_m], prev_m)
+        safe_m = np.maximum(prev_m, 0)
+        modified = known & (after_modifier | via_bridge)
+
+        # "very good": the adverb's assessment is replaced by good x intensity(very);
+        # a negated adverb divides instead ("not very good")
+        factor = np.where(negated[safe_m], 1.0 / self.intensity[ids[safe_m]], self.intensity[ids[safe_m]])
+        polarity = self.polarity[ids]
+        subjectivity = self.subjectivity[ids]
+        polarity = np.where(modified, np.clip(polarity * factor, -1.0, 1.0), polarity)
+        subjectivity = np.where(modified, np.clip(subjectivity * factor, -1.0, 1.0), subjectivity)
+        # "not good" = slightly bad, "not bad" = slightly good
+        head_negated = negated | negated_tail | (modified & (negated[safe_m] | negated_tail[safe_m]))
+        polarity = np.where(head_negated, polarity * -0.5, polarity)
+
+        absorbed = np.zeros(len(ids), dtype=bool)
+        absorbed[prev_m[modified]] = True
+        kept = known & ~absorbed
+
+        n = len(texts)
+        assessed = np.bincount(doc[kept], minlength=n)
+        divisor = np.maximum(assessed, 1)
+        polarities = np.bincount(doc[kept], weights=polarity[kept], minlength=n) / divisor
+        subjectivities = np.bincount(doc[kept], weights=subjectivity[kept], minlength=n) / divisor
+        return list(zip(polarities.tolist(), subjectivities.tolist()))
@@ -0,0 +1,79 @@
+"""
+Dashboard statistics.
+Reads only the small stats_* tables that triggers on social_media_posts keep
+up to date (see utils.database._migration_8_dashboard_stats), so each query
+costs the same however many posts are stored.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+def get_totals(conn) -> Dict[str, int]:
+    """Total posts and distinct usernames across all platforms"""
+    totals = dict(conn.execute("SELECT name, value FROM stats_totals").fetchall())
+    return {"posts": totals.get("posts", 0), "users": totals.get("users", 0)}
+
+
+def get_platform_counts(conn) -> List[dict]:
+    """Posts and distinct users per platform, largest first"""
+    rows = conn.execute("""
+        SELECT platform, posts, users
+        FROM stats_platform
+        ORDER BY posts DESC, platform
+    """).fetchall()
+    return [{"platform": r[0], "posts": r[1], "users": r[2]} for r in rows]
+
+
+def get_sentiment_by_platform(conn) -> List[dict]:
+    """Positive/neutral/negative post counts per platform (posts without a sentiment are left out)"""
+    rows = conn.execute("""
+        SELECT platform, SUM(positive), SUM(neutral), SUM(negative)
+        FROM stats_sentiment_daily
+        GROUP BY platform
+        ORDER BY platform
+    """).fetchall()
+    return [
+        {"platform": r[0], "positive": r[1], "neutral": r[2], "negative": r[3]}
+        for r in rows
+        if r[1] + r[2] + r[3]
+    ]
+
+
+def get_sentiment_daily(conn, platform: Optional[str] = None, since: Optional[str] = None) -> List[dict]:
+    """
+    Per-day post and sentiment counts, oldest first
+
+    Args:
+        conn: Open database connection
+        platform: Limit to one platform; otherwise days are summed across platforms
+        since: Only days on or after this YYYY-MM-DD date
+    """
+    where = ["day != ''"]
+    params = []
+    if platform is not None:
+        where.append("platform = ?")
+        params.append(platform)
+    if since:
+        where.append("day >= ?")
+        params.append(since)
+    rows = conn.execute(f"""
+        SELECT day, SUM(posts), SUM(positive), SUM(neutral), SUM(negative)
+        FROM stats_sentiment_daily
+        WHERE {' AND '.join(where)}
+        GROUP BY day
+        ORDER BY day
+    """, params).fetchall()
+    return [
+        {"day": r[0], "posts": r[1], "positive": r[2], "neutral": r[3], "negative": r[4]}
+        for r in rows
+    ]
+
+
+def as_series(rows: List[dict], label: str, fields: Iterable[str]) -> Dict[str, list]:
+    """
+    Column-oriented form of a list of dicts for chart APIs, e.g.
+    {"labels": [...], "posts": [...]} instead of one object per row
+    """
+    series = {"labels": [row[label] for row in rows]}
+    for field in fields:
+        series[field] = [row[field] for row in rows]
+    return series
@@ -0,0 +1,55 @@
+"""
+Text normalization for collected posts.
+A single precompiled regex pass removes URLs and symbols, whitespace is
+collapsed, non-ASCII text is NFKC-normalized and HTML (Mastodon and Telegram
+send it) has its tags stripped and entities decoded first. Letters and digits
+of every script are kept, so non-English posts still reach language detection
+intact. The original text is kept on the record as `raw_text`.
+"""
+import html
+import re
+import unicodedata
+from typing import List
+
+# Platforms whose text arrives as HTML
+HTML_PLATFORMS = frozenset({"Mastodon", "Telegram"})
+
+# Everything that is deleted: URLs, then runs of punctuation/symbols/emoji and underscores
+_REMOVE = re.compile(r"(?:https?://|www\.)\S+|[^\w\s]+|_+")
+_TAG = re.compile(r"<[^<>]{0,1000}>")
+
+
+def normalize_text(text, is_html: bool = False) -> str:
+    """
+    Cleaned form of a post's text
+
+    Args:
+        text: Raw text (None and non-strings are handled)
+        is_html: Strip tags and decode entities
+
+    Returns:
+        str: NFKC-normalized letters and digits separated by single spaces
+    """
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    if is_html:
+        text = _TAG.sub(" ", text)
+        if "&" in text:
+            text = html.unescape(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return " ".join(_REMOVE.sub("", text).split())
+
+
+def normalize_records(records: List[dict]) -> List[dict]:
+    """
+    Clean every record's text in place, keeping the original as raw_text so
+    later stages never need to clean again
+    """
+    for record in records:
+        raw = record.get("raw_text", record.get("text"))
+        record["raw_text"] = raw
+        record["text"] = normalize_text(raw, record.get("platform") in HTML_PLATFORMS) if raw else ""
+    return records
@@ -7,9 +7,8 @@ import time
 from typing import Dict, Any
 from datetime import datetime
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 from dotenv import load_dotenv
+from utils import http_client
 
 load_dotenv()
 
@@ -23,19 +22,8 @@ FACEBOOK_KEY = os.getenv("FACEBOOK_KEY")
 FACEBOOK_HOST = os.getenv("FACEBOOK_RAPID_HOST", "facebook-profile-data.p.rapidapi.com")
 TIKTOK_KEY = os.getenv("TIKTOK_KEY")
 
-# Configure retry strategy
-retry_strategy = Retry(
-    total=3,  # number of retries
-    status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
-    allowed_methods=["GET"],  # HTTP methods to retry
-    backoff_factor=1  # wait 1, 2, 4 seconds between retries
-)
-
-# Create session with retry strategy
-session = requests.Session()
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
+# All requests go through the shared pooled session in utils.http_client
+# (keep-alive per host, retry/backoff and gzip are configured there)
 
 def get_github_user_details(username: str) -> dict:
     """
@@ -55,7 +43,7 @@ def get_github_user_details(username: str) -> dict:
         headers['Authorization'] = f'token {GITHUB_TOKEN}'
 
     try:
-        response = requests.get(
+        response = http_client.get(
             f"https://api.github.com/users/{username}", 
             headers=headers,
             timeout=10
@@ -116,7 +104,7 @@ def get_twitter_user_details(username: str) -> dict:
 
     try:
         # Add timeout to prevent hanging
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http_client.get(url, headers=headers, params=params, timeout=10)
         
         # Handle rate limiting
         if response.status_code == 429:
@@ -171,7 +159,7 @@ def get_instagram_user_details(username: str) -> dict:
     params = {"user": username}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http_client.get(url, headers=headers, params=params, timeout=10)
         
         # Handle rate limiting
         if response.status_code == 429:
@@ -218,7 +206,7 @@ def get_facebook_user_details(username):
     params = {"username": username}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = http_client.get(url, headers=headers, params=params)
         if response.status_code == 200:
             data = response.json()
             return {
@@ -249,7 +237,7 @@ def get_tiktok_user_details(username):
     params = {"unique_id": username}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = http_client.get(url, headers=headers, params=params)
         if response.status_code == 200:
             data = response.json().get("user", {})
             return {
@@ -273,7 +261,7 @@ def get_reddit_user_details(username):
         return {}
 
     try:
-        response = requests.get(f"https://www.reddit.com/user/{username}/about.json",
+        response = http_client.get(f"https://www.reddit.com/user/{username}/about.json",
                               headers={'User-Agent': 'OSINT_Pipeline/1.0'})
         if response.status_code == 200:
             data = response.json().get("data", {})
@@ -301,7 +289,8 @@ def get_mastodon_user_details(username):
         from mastodon import Mastodon
         mastodon = Mastodon(
             access_token=os.getenv("MASTODON_ACCESS_TOKEN"),
-            api_base_url="https://mastodon.social"
+            api_base_url="https://mastodon.social",
+            session=http_client.get_session()
         )
         data = mastodon.account_lookup(username)
         return {
@@ -1,7 +1,14 @@
-import pandas as pd
+"""
+Offline PNG export of the dashboard charts (python main.py --export-charts).
+The web app draws the same data client-side from /api/stats/* and never
+imports this module or the matplotlib/seaborn stack.
+"""
+import os
 import matplotlib.pyplot as plt
 import seaborn as sns
-import sqlite3
+from matplotlib.figure import Figure
+from utils.database import connect
+from utils import stats
 from pathlib import Path
 from textblob import TextBlob
 
@@ -9,95 +16,93 @@ def setup_dark_theme():
     """Set up dark theme for matplotlib"""
     plt.style.use('dark_background')
     sns.set_palette("husl")
-    
-def create_platform_stats_chart(db_path, output_path):
-    """Create a visually appealing chart of platform statistics"""
-    setup_dark_theme()
-    
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    # Get platform counts
-    cursor.execute("""
-        SELECT platform, COUNT(*) as count 
-        FROM social_media_posts 
-        GROUP BY platform
-        ORDER BY count DESC
-    """)
-    data = cursor.fetchall()
-    platforms = [row[0] for row in data]
+def get_platform_counts(conn):
+    """[platform, post count] pairs, largest first"""
+    return [[row["platform"], row["posts"]] for row in stats.get_platform_counts(conn)]
+
+def render_platform_stats_chart(data, output_path):
+    """
+    Draw the platform bar chart from [platform, count] pairs. Uses the
+    object-oriented Figure API (no pyplot global state) so it is safe to call
+    from a background thread.
+    """
+    platforms = [str(row[0]) for row in data]
     counts = [row[1] for row in data]
 
-    # Create figure with transparent background
-    plt.figure(figsize=(12, 6), facecolor='#121212')
+    # Create figure with dark background
+    fig = Figure(figsize=(12, 6), facecolor='#121212')
+    ax = fig.subplots()
+    ax.set_facecolor('#121212')
     
     # Create bar plot with neon colors
-    bars = plt.bar(platforms, counts, 
-                   color=['#00ff9d', '#00ccff', '#ff00ff', '#ffff00'])
+    bars = ax.bar(platforms, counts, 
+                  color=['#00ff9d', '#00ccff', '#ff00ff', '#ffff00'])
     
     # Customize the plot
-    plt.title('Content Distribution Across Platforms', 
-              color='#00ff9d', 
-              fontsize=14, 
-              pad=20)
-    plt.xlabel('Platforms', color='#00ccff', fontsize=12)
-    plt.ylabel('Number of Posts', color='#00ccff', fontsize=12)
+    ax.set_title('Content Distribution Across Platforms', 
+                 color='#00ff9d', 
+                 fontsize=14, 
+                 pad=20)
+    ax.set_xlabel('Platforms', color='#00ccff', fontsize=12)
+    ax.set_ylabel('Number of Posts', color='#00ccff', fontsize=12)
     
     # Rotate x-axis labels
-    plt.xticks(rotation=45, ha='right', color='white')
-    plt.yticks(color='white')
+    ax.tick_params(axis='x', labelrotation=45, colors='white')
+    ax.tick_params(axis='y', colors='white')
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
     
     # Add value labels on top of bars
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
+        ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}',
                 ha='center', va='bottom', color='#00ff9d')
 
     # Customize grid
-    plt.grid(True, alpha=0.1)
+    ax.grid(True, alpha=0.1, color='white')
     
     # Add glow effect
-    plt.gca().spines['bottom'].set_color('#00ccff')
-    plt.gca().spines['top'].set_color('#00ccff')
-    plt.gca().spines['left'].set_color('#00ccff')
-    plt.gca().spines['right'].set_color('#00ccff')
+    for spine in ax.spines.values():
+        spine.set_color('#00ccff')
     
     # Adjust layout and save
-    plt.tight_layout()
-    plt.savefig(output_path, 
+    fig.tight_layout()
+    fig.savefig(output_path, 
                 bbox_inches='tight',
                 facecolor='#121212',
                 edgecolor='none',
                 dpi=300)
-    plt.close()
+
+def create_platform_stats_chart(db_path, output_path):
+    """Create a visually appealing chart of platform statistics"""
+    conn = connect(db_path)
+    try:
+        data = get_platform_counts(conn)
+    finally:
+        conn.close()
+    render_platform_stats_chart(data, output_path)
+
 
 def plot_sentiment(db_path, output_path):
     """Create sentiment analysis visualization"""
     setup_dark_theme()
     
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql("""
-        SELECT platform, text, sentiment 
-        FROM social_media_posts 
-        WHERE sentiment IS NOT NULL
-    """, conn)
+    conn = connect(db_path)
+    rows = stats.get_sentiment_by_platform(conn)
     conn.close()
 
     plt.figure(figsize=(12, 6), facecolor='#121212')
     
     # Create grouped bar plot for sentiment
-    platforms = df.platform.unique()
+    platforms = [row["platform"] for row in rows]
     sentiments = ['Positive', 'Neutral', 'Negative']
     
     data = []
-    for platform in platforms:
-        platform_data = df[df.platform == platform]
-        pos = (platform_data.sentiment > 0.2).mean()
-        neu = ((platform_data.sentiment >= -0.2) & (platform_data.sentiment <= 0.2)).mean()
-        neg = (platform_data.sentiment < -0.2).mean()
-        data.append([pos, neu, neg])
+    for row in rows:
+        scored = row["positive"] + row["neutral"] + row["negative"]
+        data.append([row["positive"] / scored, row["neutral"] / scored, row["negative"] / scored])
     
     x = range(len(platforms))
     width = 0.25
@@ -137,3 +142,21 @@ def plot_sentiment(db_path, output_path):
                 edgecolor='none',
                 dpi=300)
     plt.close()
+
+def export_charts(db_path, output_dir="screenshots"):
+    """
+    Render the dashboard charts to PNG files
+
+    Returns:
+        list: Paths of the written images
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [
+        os.path.join(output_dir, "platform_stats.png"),
+        os.path.join(output_dir, "sentiment_by_platform.png"),
+    ]
+    create_platform_stats_chart(db_path, paths[0])
+    plot_sentiment(db_path, paths[1])
+    for path in paths:
+        print(f"📊 Chart saved at: {path}")
+    return paths